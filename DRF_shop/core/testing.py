@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Test case mixin to keep endpoints within a declared number of queries.
+    Unlike `assertNumQueries` it fails only when the budget is exceeded.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget: int, name: str = ''):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}' for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{name or "Block"} ran {executed} queries, the budget is {budget}:\n{queries}')
+
+    def assertBudgetsCoverUrls(self, budgets: dict, urlconf_module: str):
+        """Every named route of `urlconf_module` must have a budget."""
+        names = {pattern.name for pattern in import_module(urlconf_module).urlpatterns if pattern.name}
+        self.assertEqual(names - set(budgets), set(), 'Endpoints without a query budget')
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from customer.services.outbox_service import OUTBOX_BATCH_SIZE, send_outbox_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails over one mail connection, batch by batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, help='Keep delivering every N seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            count = send_outbox_emails(options['batch_size'])
+            self.stdout.write(f"Handled {count} emails")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+            # A long running sender must not keep a broken or expired database connection
+            close_old_connections()
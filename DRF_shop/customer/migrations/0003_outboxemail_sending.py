@@ -0,0 +1,26 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxemail',
+            name='outbox_email_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('P', 'pending'), ('G', 'sending'), ('S', 'sent'), ('F', 'failed')], default='P', max_length=1),
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(condition=models.Q(('status__in', ('P', 'G'))), fields=['next_attempt_at', 'id'], name='outbox_email_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 20:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0003_outboxemail_sending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='claims_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.contrib.auth.hashers import check_password
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
+from django.utils import timezone
 
 from customer.services.managers import CustomUserManager
 
@@ -41,6 +42,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_confirmed_email = models.BooleanField(default=False)
+    # Access tokens issued before this carry stale claims
+    claims_changed_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -107,3 +110,45 @@ class UserAddresses(models.Model):
 
 
 
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting for delivery, written in the transaction of the action that sends it.
+    Delivered by `customer.services.outbox_service.send_outbox_emails`.
+    A SENDING email is claimed by a sender until `next_attempt_at`, then it can be claimed again.
+    """
+    PENDING = 'P'
+    SENDING = 'G'
+    SENT = 'S'
+    FAILED = 'F'
+
+    STATUS_CHOICES = (
+        (PENDING, 'pending'), (SENDING, 'sending'), (SENT, 'sent'), (FAILED, 'failed')
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField()
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.subject}, to={', '.join(self.to)}, status={self.get_status_display()}"
+
+    class Meta:
+        ordering = ('-created_at', )
+        db_table = 'outbox_emails'
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at', 'id'), condition=models.Q(status__in=('P', 'G')),
+                name='outbox_email_pending_idx'
+            ),
+        )
@@ -1,5 +1,24 @@
 from rest_framework.permissions import BasePermission
 
+from customer.services.token_service import (
+    ADDRESS_COMPLETE_CLAIM,
+    EMAIL_VERIFIED_CLAIM,
+    address_is_complete,
+    token_claims_are_stale,
+)
+
+
+def has_trusted_claim(request, claim: str) -> bool:
+    """
+    Whether the access token asserts `claim` and is newer than the last change
+    of the user claims, read from the authenticated user row.
+    A missing, false or stale claim is checked in the database.
+    """
+    token = request.auth
+    if token is None or not hasattr(token, 'payload') or token.get(claim) is not True:
+        return False
+    return not token_claims_are_stale(token, request.user)
+
 
 class IsStaffOrSuperuserPermission(BasePermission):
     def has_permission(self, request, view):
@@ -25,16 +44,9 @@ class HasCompleteAddressPermission(BasePermission):
             return False
 
         if user.is_authenticated:
-            address = user.address  # Get user address by related name
-
-            if (
-                address.city
-                and address.street_address
-                and address.apartment_address
-                and address.postal_code
-            ):
+            if has_trusted_claim(request, ADDRESS_COMPLETE_CLAIM):
                 return True
-            return False
+            return address_is_complete(user.address)  # Get user address by related name
         return False
 
 
@@ -42,4 +54,6 @@ class IsEmailVerifiedPermission(BasePermission):
     message = "Please confirm your email address!"
 
     def has_permission(self, request, view):
+        if has_trusted_claim(request, EMAIL_VERIFIED_CLAIM):
+            return True
         return request.user.is_confirmed_email
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 
 from customer.models import UserAddresses, password_regex
+from customer.tokens import ClaimsRefreshToken
 
 User = get_user_model()
 
@@ -134,3 +136,11 @@ class ChangeUserEmaiSerializer(serializers.Serializer):
         instance.is_confirmed_email = False
         instance.save()
         return instance
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
@@ -4,20 +4,32 @@ from django.contrib.auth import get_user_model
 from rest_framework.generics import UpdateAPIView
 from rest_framework import permissions
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from customer.authentication import CachedJWTAuthentication
+from customer.services.token_service import require_token_refresh
 
 
 User = get_user_model()
 
 
+def get_fresh_user(user) -> User:
+    """
+    The current row of an authenticated user. `request.user` may come from the
+    user cache, views that validate against the user or save it must use this.
+    """
+    return User.objects.select_related('address').get(pk=user.pk)
+
+
 class UpdateUserAPIView(UpdateAPIView):
     """Updates User fields by given serializer class"""
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
     queryset = User
+    # Set when the update can change the claims embedded in access tokens
+    changes_token_claims = False
 
     def get_object(self) -> User:
-        return self.request.user
+        return get_fresh_user(self.request.user)
 
     def update(self, request, *args, **kwargs) -> Response:
         instance = self.get_object()
@@ -25,7 +37,10 @@ class UpdateUserAPIView(UpdateAPIView):
 
         if serializer.is_valid(raise_exception=True):
             serializer.save()
-            return Response({"message": "Updated successes"})
+            response = Response({"message": "Updated successes"})
+            if self.changes_token_claims:
+                return require_token_refresh(response, instance.id)
+            return response
 
         return Response({"message": "failed", "details": serializer.errors})
 
@@ -1,31 +1,24 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import EmailMultiAlternatives
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.response import Response
 
+from customer.services.outbox_service import enqueue_email
+
 
 def send_verification_email(user):
+    """Queue the email verification link, it is delivered by the outbox sender."""
     confirmation_token = default_token_generator.make_token(user)
     user_id = user.id
     body = f"Here is your reset password url http://localhost:8000/{reverse('email_verification')}" \
-           f"?user_id={user_id}&confirmation_token={confirmation_token}",
+           f"?user_id={user_id}&confirmation_token={confirmation_token}"
 
-    msg = EmailMultiAlternatives(
+    enqueue_email(
         # title:
         "Password Reset for {title}".format(title="..."),
         # message:
         body,
-        # from:
-        "example@example.com",
         # to:
         [user.email]
     )
-    print(body)
-    try:
-        if msg.send():
-            return Response(status=status.HTTP_200_OK)
-    except Exception as e:
-        print(e)
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+    return Response(status=status.HTTP_200_OK)
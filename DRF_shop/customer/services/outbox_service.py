@@ -0,0 +1,150 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from customer.models import OutboxEmail
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+# Retry delays grow as OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), up to OUTBOX_MAX_RETRY_DELAY
+OUTBOX_RETRY_DELAY = timedelta(seconds=30)
+OUTBOX_MAX_RETRY_DELAY = timedelta(hours=1)
+# How long a claimed batch belongs to its sender
+OUTBOX_SENDING_TIMEOUT = timedelta(minutes=10)
+
+logger = logging.getLogger(__name__)
+
+
+class MailConnectionLost(Exception):
+    """The mail connection broke and could not be reopened."""
+
+    def __init__(self, handled: int):
+        super().__init__(f'Mail connection lost after {handled} emails')
+        self.handled = handled
+
+
+def enqueue_email(subject: str, body: str, to: list, from_email: str = None) -> OutboxEmail:
+    """Queue an email, it is only delivered if the current transaction commits."""
+    return OutboxEmail.objects.create(
+        subject=subject, body=body, to=list(to), from_email=from_email or settings.DEFAULT_FROM_EMAIL
+    )
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    return min(OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), OUTBOX_MAX_RETRY_DELAY)
+
+
+def _to_message(email: OutboxEmail, connection) -> EmailMultiAlternatives:
+    return EmailMultiAlternatives(email.subject, email.body, email.from_email, email.to, connection=connection)
+
+
+def _deliver(emails: list, connection) -> tuple:
+    """
+    Send the emails one by one over the shared connection, so a failure
+    never resends an email the server has already accepted.
+    Returns the error of every failed email by id, and the emails left unsent
+    because the connection could not be reopened after a failure.
+    """
+    errors = {}
+    for index, email in enumerate(emails):
+        try:
+            connection.send_messages([_to_message(email, connection)])
+        except Exception as error:
+            errors[email.id] = f'{type(error).__name__}: {error}'
+            # The failure may have broken the connection, go on with a fresh one
+            try:
+                connection.close()
+                connection.open()
+            except Exception:
+                logger.exception('Could not reopen the mail connection')
+                return errors, emails[index + 1:]
+    return errors, []
+
+
+def claim_outbox_emails(batch_size: int = OUTBOX_BATCH_SIZE) -> list:
+    """
+    Mark a batch of due emails as SENDING in one short transaction.
+    The claim expires after OUTBOX_SENDING_TIMEOUT, emails of a sender that
+    died halfway are claimed again then.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        emails = list(OutboxEmail.objects.filter(
+            status__in=(OutboxEmail.PENDING, OutboxEmail.SENDING), next_attempt_at__lte=now
+        ).select_for_update(skip_locked=True).order_by('next_attempt_at', 'id')[:batch_size])
+        if emails:
+            OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                status=OutboxEmail.SENDING, next_attempt_at=now + OUTBOX_SENDING_TIMEOUT, updated_at=now
+            )
+    return emails
+
+
+def record_outbox_results(emails: list, errors: dict) -> None:
+    """Mark delivered emails as sent, reschedule failed ones with backoff."""
+    now = timezone.now()
+    sent_ids = [email.id for email in emails if email.id not in errors]
+    if sent_ids:
+        OutboxEmail.objects.filter(id__in=sent_ids).update(
+            status=OutboxEmail.SENT, sent_at=now, last_error='', updated_at=now
+        )
+
+    failed = [email for email in emails if email.id in errors]
+    for email in failed:
+        email.attempts += 1
+        email.last_error = errors[email.id]
+        email.next_attempt_at = now + get_retry_delay(email.attempts)
+        email.status = OutboxEmail.FAILED if email.attempts >= OUTBOX_MAX_ATTEMPTS else OutboxEmail.PENDING
+        email.updated_at = now
+    OutboxEmail.objects.bulk_update(failed, ('attempts', 'last_error', 'next_attempt_at', 'status', 'updated_at'))
+
+
+def release_outbox_emails(emails: list) -> None:
+    """Hand claimed emails that were not tried back to the queue, without counting an attempt."""
+    now = timezone.now()
+    OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+        status=OutboxEmail.PENDING, next_attempt_at=now + OUTBOX_RETRY_DELAY, updated_at=now
+    )
+
+
+def send_outbox_batch(connection, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Deliver one batch of due emails, returns the number of emails handled.
+    No transaction or row lock is held while talking to the mail server.
+    Raises MailConnectionLost, once the results are stored, when the connection is gone.
+    """
+    emails = claim_outbox_emails(batch_size)
+    if not emails:
+        return 0
+
+    errors, unsent = _deliver(emails, connection)
+    attempted = emails[:len(emails) - len(unsent)]
+    record_outbox_results(attempted, errors)
+    if unsent:
+        release_outbox_emails(unsent)
+        raise MailConnectionLost(len(attempted))
+    return len(emails)
+
+
+def send_outbox_emails(batch_size: int = OUTBOX_BATCH_SIZE, connection=None) -> int:
+    """
+    Deliver all due emails over a single mail connection, batch by batch.
+    Returns the number of emails handled, failures included.
+    Stops early when the connection is lost, the rest waits for the next run.
+    """
+    connection = connection or get_connection()
+    handled = 0
+    connection.open()
+    try:
+        while True:
+            count = send_outbox_batch(connection, batch_size)
+            handled += count
+            if count < batch_size:
+                return handled
+    except MailConnectionLost as error:
+        return handled + error.handled
+    finally:
+        connection.close()
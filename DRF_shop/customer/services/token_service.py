@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from customer.services.user_cache import invalidate_user
+
+User = get_user_model()
+
+EMAIL_VERIFIED_CLAIM = 'email_verified'
+ADDRESS_COMPLETE_CLAIM = 'address_complete'
+# Response header telling the client to refresh its access token
+TOKEN_REFRESH_HEADER = 'X-Token-Refresh-Required'
+
+
+def address_is_complete(address) -> bool:
+    return bool(
+        address
+        and address.city
+        and address.street_address
+        and address.apartment_address
+        and address.postal_code
+    )
+
+
+def get_token_claims(user) -> dict:
+    """Claims embedded in access tokens, `user` should come with its address loaded."""
+    try:
+        address = user.address
+    except user._meta.model.address.RelatedObjectDoesNotExist:
+        address = None
+
+    return {
+        EMAIL_VERIFIED_CLAIM: user.is_confirmed_email,
+        ADDRESS_COMPLETE_CLAIM: address_is_complete(address),
+    }
+
+
+def mark_token_claims_changed(user_id) -> None:
+    """Make the claims of every access token issued so far for the user stale."""
+    User.objects.filter(id=user_id).update(claims_changed_at=timezone.now())
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+def token_claims_are_stale(token, user) -> bool:
+    """Whether `token` was issued before the last claims change of `user`, its owner."""
+    if user.claims_changed_at is None:
+        return False
+    return token.get('iat', 0) <= user.claims_changed_at.timestamp()
+
+
+def require_token_refresh(response, user_id):
+    """Mark the claims of the user stale and tell the client to refresh its token."""
+    mark_token_claims_changed(user_id)
+    response[TOKEN_REFRESH_HEADER] = 'true'
+    return response
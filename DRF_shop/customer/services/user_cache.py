@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+User = get_user_model()
+
+# Short enough that a missed invalidation (e.g. a queryset `.update()`) heals quickly
+USER_CACHE_TIMEOUT = 60
+
+
+def _user_key(user_id) -> str:
+    return f'user:{user_id}'
+
+
+def get_cached_user(user_id) -> User:
+    """
+    User by id with the address preloaded, read through the cache.
+    The password hash is deferred, it is never stored in the shared cache.
+    Raises User.DoesNotExist like `User.objects.get`.
+    """
+    key = _user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.select_related('address').defer('password').get(id=user_id)
+        cache.set(key, user, timeout=USER_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_user(user_id) -> None:
+    cache.delete(_user_key(user_id))
@@ -1,11 +1,13 @@
-from django.core.mail import EmailMultiAlternatives
 from django.dispatch import receiver
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django_rest_passwordreset.signals import reset_password_token_created
 
 from customer.models import UserAddresses, PhoneNumbers
+from customer.services.outbox_service import enqueue_email
+from customer.services.user_cache import invalidate_user
 
 User = get_user_model()
 
@@ -22,13 +24,28 @@ def create_user_phone_number(sender, instance, created, *args, **kwargs):
         PhoneNumbers.objects.create(user=instance)
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, *args, **kwargs):
+    """Covers profile edits, password changes and deactivation, all saved through the model"""
+    user_id = instance.id
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(post_save, sender=UserAddresses)
+@receiver(post_delete, sender=UserAddresses)
+def invalidate_cached_user_address(sender, instance, *args, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
 @receiver(reset_password_token_created)
 def password_reset_token_created(sender, instance, reset_password_token, *args, **kwargs):
     """
-    Generate and send e-male to the user
+    Generate and queue e-male to the user
     """
 
-    # send an e-mail to the user
+    # queue an e-mail to the user, the outbox sender delivers it
     context = {
         'current_user': reset_password_token.user,
         'email': reset_password_token.user.email,
@@ -37,17 +54,11 @@ def password_reset_token_created(sender, instance, reset_password_token, *args,
             reset_password_token.key)
     }
 
-    msg = EmailMultiAlternatives(
+    enqueue_email(
         # title:
         "Password Reset for {title}".format(title="..."),
         # message:
         "Here is your reset password url {url}".format(url=context.get('reset_password_url')),
-        # from:
-        "example@example.com",
         # to:
         [reset_password_token.user.email]
     )
-    try:
-        msg.send()
-    except Exception as e:
-        print(e)
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from customer.authentication import CachedJWTAuthentication
+
+User = get_user_model()
+
+
+class TestCachedJWTAuthentication(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='test@email.com', password='12345678')
+
+    def setUp(self):
+        cache.clear()
+        self.authentication = CachedJWTAuthentication()
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, user=None):
+        token = AccessToken.for_user(user or self.user)
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _ = self.authentication.authenticate(request)
+        return user
+
+    def test_warm_cache_runs_no_queries(self):
+        self.authenticate()
+
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual(user, self.user)
+            # The address is preloaded in the same cache entry
+            self.assertEqual(user.address.user_id, self.user.id)
+
+    def test_user_save_invalidates_cache(self):
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(id=self.user.id)
+            user.first_name = 'Changed'
+            user.save()
+
+        self.assertEqual(self.authenticate().first_name, 'Changed')
+
+    def test_address_save_invalidates_cache(self):
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            address = self.user.address
+            address.city = 'Kyiv'
+            address.save()
+
+        self.assertEqual(self.authenticate().address.city, 'Kyiv')
+
+    def test_password_change_invalidates_cache(self):
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(id=self.user.id)
+            user.set_password('87654321')
+            user.save()
+
+        self.assertTrue(self.authenticate().check_password('87654321'))
+
+    def test_password_hash_is_not_cached(self):
+        self.authenticate()
+
+        self.assertIn('password', cache.get(f'user:{self.user.id}').get_deferred_fields())
+
+    def test_write_views_use_the_current_row(self):
+        token = AccessToken.for_user(self.user)
+        self.authenticate()
+        # Changed by another process, the cached user still holds the old state
+        User.objects.filter(id=self.user.id).update(first_name='Changed')
+        user = User.objects.get(id=self.user.id)
+        user.set_password('87654321')
+        User.objects.filter(id=self.user.id).update(password=user.password)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = client.put(reverse('change_password'), {
+            'old_password': '12345678', 'new_password': 'abcdefgh', 'confirm_password': 'abcdefgh'
+        })
+        self.assertEqual(response.status_code, 400)
+
+        response = client.put(reverse('change_email'), {'email': 'new@email.com'})
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(id=self.user.id)
+        self.assertEqual(user.first_name, 'Changed')
+        self.assertTrue(user.check_password('87654321'))
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(id=self.user.id)
+            user.is_active = False
+            user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_user_is_rejected(self):
+        user = User.objects.create_user(email='deleted@email.com', password='12345678')
+        self.authenticate(user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(id=user.id).delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(user)
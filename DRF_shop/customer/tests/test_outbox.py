@@ -0,0 +1,204 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from customer.models import OutboxEmail
+from customer.services import outbox_service
+
+User = get_user_model()
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class CountingBackend(EmailBackend):
+    """
+    Locmem backend that records its connections and fails on chosen recipients.
+    Like the SMTP backend, messages before the failing one are delivered.
+    """
+    opened = 0
+    batches = []
+    failing = set()
+    statuses = []
+    can_reopen = True
+
+    def open(self):
+        if CountingBackend.opened and not CountingBackend.can_reopen:
+            raise ConnectionError('Connection refused')
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        CountingBackend.batches.append(len(messages))
+        CountingBackend.statuses.extend(OutboxEmail.objects.filter(
+            to__in=[message.to for message in messages]
+        ).values_list('status', flat=True))
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise ConnectionError('Recipient refused')
+            super().send_messages([message])
+        return len(messages)
+
+
+COUNTING_BACKEND = f'{__name__}.CountingBackend'
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_BACKEND)
+class TestOutbox(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='test@email.com', password='12345678')
+
+    def setUp(self):
+        self.client = APIClient()
+        CountingBackend.opened = 0
+        CountingBackend.batches = []
+        CountingBackend.failing = set()
+        CountingBackend.statuses = []
+        CountingBackend.can_reopen = True
+
+    def test_verification_email_is_queued_not_sent(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('send_email_verification'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, [self.user.email])
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertIn('confirmation_token=', email.body)
+
+        self.assertEqual(outbox_service.send_outbox_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].body, email.body)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.SENT)
+        self.assertIsNotNone(email.sent_at)
+
+    def test_password_reset_email_is_queued(self):
+        response = self.client.post(reverse('password_reset:reset-password-request'), {'email': self.user.email})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIn('token=', OutboxEmail.objects.get(to=[self.user.email]).body)
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_emails_are_sent_over_one_connection(self):
+        for i in range(5):
+            outbox_service.enqueue_email('Subject', 'Body', [f'user{i}@email.com'])
+
+        self.assertEqual(outbox_service.send_outbox_emails(batch_size=2), 5)
+
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(CountingBackend.batches, [1] * 5)
+        # Emails are claimed before they are sent
+        self.assertEqual(CountingBackend.statuses, [OutboxEmail.SENDING] * 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists())
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_failure_does_not_resend_delivered_emails(self):
+        CountingBackend.failing = {'bad@email.com'}
+        outbox_service.enqueue_email('Subject', 'Body', ['first@email.com'])
+        outbox_service.enqueue_email('Subject', 'Body', ['bad@email.com'])
+        outbox_service.enqueue_email('Subject', 'Body', ['last@email.com'])
+
+        self.assertEqual(outbox_service.send_outbox_emails(), 3)
+
+        self.assertEqual(
+            [message.to for message in mail.outbox], [['first@email.com'], ['last@email.com']]
+        )
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 2)
+        self.assertEqual(OutboxEmail.objects.get(to=['bad@email.com']).status, OutboxEmail.PENDING)
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_lost_connection_stops_the_run(self):
+        CountingBackend.failing = {'bad@email.com'}
+        CountingBackend.can_reopen = False
+        outbox_service.enqueue_email('Subject', 'Body', ['first@email.com'])
+        outbox_service.enqueue_email('Subject', 'Body', ['bad@email.com'])
+        outbox_service.enqueue_email('Subject', 'Body', ['last@email.com'])
+        outbox_service.enqueue_email('Subject', 'Body', ['next@email.com'])
+
+        with self.assertLogs(outbox_service.__name__, 'ERROR'):
+            self.assertEqual(outbox_service.send_outbox_emails(batch_size=3), 2)
+
+        self.assertEqual(CountingBackend.batches, [1, 1])
+        self.assertEqual([message.to for message in mail.outbox], [['first@email.com']])
+        bad = OutboxEmail.objects.get(to=['bad@email.com'])
+        self.assertEqual((bad.status, bad.attempts), (OutboxEmail.PENDING, 1))
+        # Emails that were never tried go back to the queue without losing an attempt
+        for to in ('last@email.com', 'next@email.com'):
+            email = OutboxEmail.objects.get(to=[to])
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 0))
+
+    def test_expired_claim_is_sent_again(self):
+        email = outbox_service.enqueue_email('Subject', 'Body', ['user@email.com'])
+        claimed, = outbox_service.claim_outbox_emails()
+        self.assertEqual(claimed.id, email.id)
+
+        # Claimed by a sender that is still working, or died
+        self.assertEqual(outbox_service.claim_outbox_emails(), [])
+        OutboxEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+
+        self.assertEqual(outbox_service.send_outbox_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_failed_email_is_retried_with_backoff(self):
+        CountingBackend.failing = {'bad@email.com'}
+        good = outbox_service.enqueue_email('Subject', 'Body', ['good@email.com'])
+        bad = outbox_service.enqueue_email('Subject', 'Body', ['bad@email.com'])
+
+        self.assertEqual(outbox_service.send_outbox_emails(), 2)
+
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.status, OutboxEmail.SENT)
+        self.assertEqual(bad.status, OutboxEmail.PENDING)
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn('Recipient refused', bad.last_error)
+        self.assertGreater(bad.next_attempt_at, timezone.now())
+        self.assertEqual([message.to for message in mail.outbox], [['good@email.com']])
+
+        # Not due yet, nothing is sent
+        self.assertEqual(outbox_service.send_outbox_emails(), 0)
+
+        CountingBackend.failing = set()
+        OutboxEmail.objects.filter(id=bad.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox_service.send_outbox_emails(), 1)
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, OutboxEmail.SENT)
+
+    @override_settings(EMAIL_BACKEND=COUNTING_BACKEND)
+    def test_email_fails_after_max_attempts(self):
+        CountingBackend.failing = {'bad@email.com'}
+        bad = outbox_service.enqueue_email('Subject', 'Body', ['bad@email.com'])
+
+        for _ in range(outbox_service.OUTBOX_MAX_ATTEMPTS):
+            OutboxEmail.objects.filter(id=bad.id).update(next_attempt_at=timezone.now())
+            outbox_service.send_outbox_emails()
+
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, OutboxEmail.FAILED)
+        self.assertEqual(bad.attempts, outbox_service.OUTBOX_MAX_ATTEMPTS)
+
+    def test_retry_delay_grows_up_to_the_limit(self):
+        self.assertEqual(outbox_service.get_retry_delay(1), timedelta(seconds=30))
+        self.assertEqual(outbox_service.get_retry_delay(2), timedelta(seconds=60))
+        self.assertEqual(outbox_service.get_retry_delay(20), outbox_service.OUTBOX_MAX_RETRY_DELAY)
+
+    def test_send_outbox_emails_command(self):
+        outbox_service.enqueue_email('Subject', 'Body', ['user@email.com'])
+
+        call_command('send_outbox_emails', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
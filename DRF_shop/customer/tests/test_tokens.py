@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from customer.authentication import CachedJWTAuthentication
+from customer.permissions import HasCompleteAddressPermission, IsEmailVerifiedPermission
+from customer.services.token_service import (
+    ADDRESS_COMPLETE_CLAIM,
+    EMAIL_VERIFIED_CLAIM,
+    TOKEN_REFRESH_HEADER,
+    mark_token_claims_changed,
+)
+from customer.services.user_cache import get_cached_user
+
+User = get_user_model()
+
+
+class TestTokenClaims(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='test@email.com', password='12345678')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def obtain_tokens(self) -> dict:
+        response = self.client.post(
+            reverse('token_obtain_pair'), {'email': 'test@email.com', 'password': '12345678'}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def complete_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            address = self.user.address
+            address.city, address.street_address = 'city', 'street'
+            address.apartment_address, address.postal_code = 'apartment', '01001'
+            address.save()
+            user = User.objects.get(id=self.user.id)
+            user.is_confirmed_email = True
+            user.save()
+
+    def check_permission(self, permission, token, user=None) -> bool:
+        request = SimpleNamespace(user=user or User.objects.get(id=self.user.id), auth=token, data={})
+        return permission().has_permission(request, None)
+
+    def test_obtained_access_token_carries_claims(self):
+        access = AccessToken(self.obtain_tokens()['access'])
+
+        self.assertIs(access[EMAIL_VERIFIED_CLAIM], False)
+        self.assertIs(access[ADDRESS_COMPLETE_CLAIM], False)
+
+    def test_refreshed_access_token_reads_current_claims(self):
+        refresh = self.obtain_tokens()['refresh']
+        self.complete_user()
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data['access'])
+        self.assertIs(access[EMAIL_VERIFIED_CLAIM], True)
+        self.assertIs(access[ADDRESS_COMPLETE_CLAIM], True)
+
+    def test_refresh_ignores_stale_cached_user(self):
+        self.complete_user()
+        refresh = self.obtain_tokens()['refresh']
+        get_cached_user(self.user.id)
+        # Changed by another process, this process still caches the verified user
+        User.objects.filter(id=self.user.id).update(is_confirmed_email=False)
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+
+        self.assertIs(AccessToken(response.data['access'])[EMAIL_VERIFIED_CLAIM], False)
+
+    def test_permissions_trust_claims_without_database(self):
+        self.complete_user()
+        access = AccessToken(self.obtain_tokens()['access'])
+        # The claims are trusted even if the loaded user does not show it
+        user = User(id=self.user.id, is_confirmed_email=False)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check_permission(IsEmailVerifiedPermission, access, user))
+            self.assertTrue(self.check_permission(HasCompleteAddressPermission, access, user))
+
+    def test_stale_claims_fall_back_to_database(self):
+        self.complete_user()
+        access = AccessToken(self.obtain_tokens()['access'])
+        User.objects.filter(id=self.user.id).update(is_confirmed_email=False)
+
+        mark_token_claims_changed(self.user.id)
+
+        self.assertFalse(self.check_permission(IsEmailVerifiedPermission, access))
+        self.assertTrue(self.check_permission(HasCompleteAddressPermission, access))
+
+    def test_missing_claims_fall_back_to_database(self):
+        access = AccessToken.for_user(self.user)
+
+        self.assertFalse(self.check_permission(IsEmailVerifiedPermission, access))
+        self.complete_user()
+        self.assertTrue(self.check_permission(IsEmailVerifiedPermission, access))
+
+    def test_change_email_requires_token_refresh(self):
+        self.complete_user()
+        access = AccessToken(self.obtain_tokens()['access'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                reverse('change_email'), {'email': 'new@email.com'}, HTTP_AUTHORIZATION=f'Bearer {access}'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response[TOKEN_REFRESH_HEADER], 'true')
+        # Staleness is stored on the user row, losing the cache does not make the claim trusted again
+        cache.clear()
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        user, token = CachedJWTAuthentication().authenticate(request)
+        self.assertIsNotNone(user.claims_changed_at)
+        self.assertFalse(self.check_permission(IsEmailVerifiedPermission, token, user))
+
+    def test_update_user_and_verification_require_token_refresh(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.put(reverse('update_user'), {
+            'first_name': 'Name', 'address': {
+                'city': 'city', 'street_address': 'street', 'apartment_address': 'apartment', 'postal_code': ''
+            }
+        }, format='json')
+        self.assertEqual(response[TOKEN_REFRESH_HEADER], 'true')
+
+        response = self.client.get(reverse('email_verification'), {
+            'user_id': self.user.id, 'confirmation_token': default_token_generator.make_token(self.user)
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response[TOKEN_REFRESH_HEADER], 'true')
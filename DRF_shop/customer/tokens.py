@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from customer.services.token_service import get_token_claims
+
+User = get_user_model()
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the `email_verified` and
+    `address_complete` claims, read from the user row on every obtain and refresh.
+    The user cache is not used, a copy cached by another process could be stale.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        try:
+            user = User.objects.select_related('address').get(id=self[api_settings.USER_ID_CLAIM])
+        except User.DoesNotExist:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        for claim, value in get_token_claims(user).items():
+            access[claim] = value
+        return access
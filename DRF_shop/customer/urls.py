@@ -1,8 +1,4 @@
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
 
 from . import views
 
@@ -21,6 +17,6 @@ urlpatterns = [
 
     path('user/email/change/', views.ChangeEmail.as_view(), name='change_email'),
 
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/', views.ClaimsTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', views.ClaimsTokenRefreshView.as_view(), name='token_refresh'),
 ]
@@ -9,11 +9,13 @@ from rest_framework.generics import (
 )
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from customer.authentication import CachedJWTAuthentication
 from customer import serializers
-from customer.services.client_service import UpdateUserAPIView, get_user
+from customer.services.client_service import UpdateUserAPIView, get_fresh_user, get_user
 from customer.services import email_service
+from customer.services.token_service import require_token_refresh
 
 User = get_user_model()
 
@@ -26,7 +28,7 @@ class RegisterClientView(CreateAPIView):
 
 class RetrieveUserView(RetrieveAPIView):
     """Retrieve User by JWT Authentication"""
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = serializers.UserSerializer
 
@@ -36,9 +38,20 @@ class RetrieveUserView(RetrieveAPIView):
         return get_user(user_id=user_id)
 
 
+class ClaimsTokenObtainPairView(TokenObtainPairView):
+    """Token pair whose access token carries the email_verified and address_complete claims"""
+    serializer_class = serializers.ClaimsTokenObtainPairSerializer
+
+
+class ClaimsTokenRefreshView(TokenRefreshView):
+    """Refreshed access token with claims read from the current user state"""
+    serializer_class = serializers.ClaimsTokenRefreshSerializer
+
+
 class UpdateUserView(UpdateUserAPIView):
     """Create or update user first_name, last_name and address fields"""
     serializer_class = serializers.UserSerializer
+    changes_token_claims = True
 
 
 class ChangePasswordView(UpdateUserAPIView):
@@ -49,22 +62,24 @@ class ChangePasswordView(UpdateUserAPIView):
 class ChangeEmail(UpdateUserAPIView):
     """Change User email with setting is_confirmed_email to False"""
     serializer_class = serializers.ChangeUserEmaiSerializer
+    changes_token_claims = True
 
 
 class DestroyUserView(DestroyAPIView):
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        return get_fresh_user(self.request.user)
 
 
 class SendEmailVerification(APIView):
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def post(self, request):
-        user = self.request.user
+        # The token is derived from the password hash, which the cached user does not hold
+        user = get_fresh_user(self.request.user)
         return email_service.send_verification_email(user)
 
 
@@ -88,5 +103,5 @@ class EmailVerification(APIView):
 
         user.is_confirmed_email = True
         user.save()
-        return Response('Email successfully confirmed')
+        return require_token_refresh(Response('Email successfully confirmed'), user.id)
 
@@ -0,0 +1,66 @@
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from order.services.checkout_services import CHECKOUT_BATCH_SIZE, drain_checkout_queue, requeue_stale_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(batch_size: int, poll_interval: float, once: bool) -> None:
+    """Drain the checkout queue, then poll it, or return once it is empty with `once`."""
+    django.setup()
+    while True:
+        close_old_connections()
+        try:
+            requeue_stale_jobs()
+            processed = drain_checkout_queue(batch_size)
+        except Exception:
+            # E.g. the database went away, a broken connection is replaced on the next round
+            logger.exception('Checkout worker round failed')
+            processed = 0
+        if once:
+            return
+        if not processed:
+            time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Run worker processes that create the orders of queued checkouts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=CHECKOUT_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait on an empty queue.')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError('--processes must be positive.')
+
+        worker_args = (options['batch_size'], options['poll_interval'], options['once'])
+        if options['processes'] == 1:
+            run_worker(*worker_args)
+            return
+
+        workers = [self.start_worker(worker_args) for _ in range(options['processes'])]
+        self.stdout.write(f"Started {len(workers)} checkout workers")
+        while workers:
+            wait([worker.sentinel for worker in workers])
+            for worker in [worker for worker in workers if not worker.is_alive()]:
+                workers.remove(worker)
+                if worker.exitcode and not options['once']:
+                    self.stderr.write(f"Checkout worker {worker.pid} exited with {worker.exitcode}, restarting")
+                    workers.append(self.start_worker(worker_args))
+
+    def start_worker(self, worker_args) -> multiprocessing.Process:
+        # Children must open their own database connections
+        connections.close_all()
+        worker = multiprocessing.Process(target=run_worker, args=worker_args, daemon=True)
+        worker.start()
+        return worker
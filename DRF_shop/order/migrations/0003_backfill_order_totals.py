@@ -0,0 +1,49 @@
+from django.db import migrations, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def backfill_order_totals(apps, schema_editor):
+    """
+    Store the unit price of existing items and the total of existing orders,
+    one short transaction per chunk of orders. Historical prices are unknown,
+    the current product price is the best estimate.
+    """
+    Order = apps.get_model('order', 'Order')
+    OrderItem = apps.get_model('order', 'OrderItem')
+    Product = apps.get_model('product', 'Product')
+
+    product_price = Product.objects.filter(id=OuterRef('product_id')).values('price')
+    order_total = OrderItem.objects.filter(order_id=OuterRef('pk')).order_by().values('order_id').annotate(
+        total=Sum(F('quantity') * F('unit_price'), output_field=DecimalField(max_digits=12, decimal_places=2))
+    ).values('total')
+
+    last_id = 0
+    while True:
+        ids = list(
+            Order.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:BACKFILL_CHUNK_SIZE]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic(using=schema_editor.connection.alias):
+            OrderItem.objects.filter(order_id__in=ids).update(unit_price=Subquery(product_price))
+            Order.objects.filter(id__in=ids).update(
+                total=Coalesce(Subquery(order_total), 0, output_field=DecimalField())
+            )
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+    # Chunks commit on their own, the orders table is not locked for the whole backfill
+    atomic = False
+
+    dependencies = [
+        ('order', '0002_order_unit_price_total'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0003_backfill_order_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['buyer', '-created_at'], name='order_buyer_created_idx'),
+        ),
+    ]
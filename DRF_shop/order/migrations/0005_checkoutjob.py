@@ -0,0 +1,35 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('order', '0004_order_buyer_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckoutJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Q', 'queued'), ('P', 'processing'), ('D', 'done'), ('F', 'failed')], default='Q', max_length=1)),
+                ('payload', models.JSONField()),
+                ('errors', models.JSONField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkout_jobs', to=settings.AUTH_USER_MODEL)),
+                ('order', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checkout_job', to='order.order')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(condition=models.Q(('status', 'Q')), fields=['id'], name='checkout_job_queued_idx')],
+            },
+        ),
+    ]
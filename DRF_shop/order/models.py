@@ -1,6 +1,5 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.utils.functional import cached_property
 
 from product.models import Product
 
@@ -23,22 +22,28 @@ class Order(models.Model):
         User, related_name='orders', on_delete=models.CASCADE)
     status = models.CharField(
         max_length=1, choices=STATUS_CHOICES, default=PENDING)
+    # Sum of the item costs at checkout
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('-created_at', )
+        indexes = (
+            # Order history of a buyer, newest first
+            models.Index(fields=('buyer', '-created_at'), name='order_buyer_created_idx'),
+        )
 
     def __str__(self):
         return f"{self.buyer}"
 
-    @cached_property
+    @property
     def total_cost(self):
         """
         Total cost of all the items in an order
         """
-        return round(sum([order_item.cost for order_item in self.order_items.all()]), 2)
+        return self.total
 
 
 class DeliveryAddress(models.Model):
@@ -63,6 +68,8 @@ class OrderItem(models.Model):
     product = models.ForeignKey(
         Product, related_name="product_orders", on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    # Product price at checkout, later repricing does not change the order
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -73,9 +80,49 @@ class OrderItem(models.Model):
     def __str__(self):
         return f'{self.order}, {self.product}, {self.quantity}'
 
-    @cached_property
+    @property
     def cost(self):
         """
         Total cost of the ordered item
         """
-        return round(self.quantity * self.product.price, 2)
+        return round(self.quantity * self.unit_price, 2)
+
+
+class CheckoutJob(models.Model):
+    """
+    A checkout accepted for processing by the checkout workers.
+    `payload` is the order request as validated on enqueue.
+    """
+    QUEUED = 'Q'
+    PROCESSING = 'P'
+    DONE = 'D'
+    FAILED = 'F'
+
+    STATUS_CHOICES = (
+        (QUEUED, 'queued'), (PROCESSING, 'processing'),
+        (DONE, 'done'), (FAILED, 'failed')
+    )
+
+    buyer = models.ForeignKey(
+        User, related_name='checkout_jobs', on_delete=models.CASCADE)
+    status = models.CharField(
+        max_length=1, choices=STATUS_CHOICES, default=QUEUED)
+    payload = models.JSONField()
+    order = models.OneToOneField(
+        Order, related_name='checkout_job', null=True, blank=True, on_delete=models.SET_NULL)
+    errors = models.JSONField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('-created_at', )
+        indexes = (
+            # The queue, workers claim the oldest queued jobs
+            models.Index(fields=('id',), condition=models.Q(status='Q'), name='checkout_job_queued_idx'),
+        )
+
+    def __str__(self):
+        return f"{self.buyer}, {self.get_status_display()}"
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OrderHistoryPagination(CursorPagination):
+    """
+    Newest orders first, every page is one range scan of the
+    (buyer, -created_at) index without COUNT(*) and OFFSET.
+    """
+    ordering = '-created_at'
@@ -3,8 +3,11 @@ from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
-from order.models import Order, OrderItem, DeliveryAddress
+from order.models import CheckoutJob, Order, OrderItem, DeliveryAddress
+from product.models import Product
+from order.services.stock_services import get_order_quantities, reserve_stock
 
 User = get_user_model()
 
@@ -16,28 +19,19 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = OrderItem
-        fields = ('id', 'order', 'product', 'quantity',
+        fields = ('id', 'order', 'product', 'quantity', 'unit_price',
                   'created_at', 'updated_at')
-        read_only_fields = ('order',)
+        read_only_fields = ('order', 'unit_price')
 
-    def validate(self, validated_data):
-        order_quantity = validated_data['quantity']
-        product_quantity = validated_data['product'].quantity
 
-        order_id = self.context['view'].kwargs.get('order_id')
-        product_id = validated_data['product']
-        current_item = OrderItem.objects.filter(
-            order__id=order_id, product=product_id)
-
-        if order_quantity > product_quantity:
-            error = {'quantity': 'Ordered quantity is more than the stock.'}
-            raise serializers.ValidationError(error)
-
-        if not self.instance and current_item.count() > 0:
-            error = {'product': 'Product already exists in your order.'}
-            raise serializers.ValidationError(error)
-
-        return validated_data
+class CreateOrderItemSerializer(OrderItemSerializer):
+    """
+    Order item of a new order, the product is given by id.
+    Products are looked up and checked for the whole order at once
+    by `CreateOrderSerializer.validate_order_items`.
+    """
+    product = serializers.IntegerField(source='product_id', min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
 
 
 class DeliveryAddressSerializer(ModelSerializer):
@@ -53,28 +47,56 @@ class CreateOrderSerializer(ModelSerializer):
     orders, order items and delivery addresses.
     """
     buyer = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    order_items = OrderItemSerializer(many=True)
+    order_items = CreateOrderItemSerializer(many=True)
     delivery_address = DeliveryAddressSerializer(required=False)
     use_new_address = serializers.BooleanField(default=False)
 
     class Meta:
         model = Order
-        fields = ('id', 'buyer', 'status', 'order_items', 'delivery_address',
+        fields = ('id', 'buyer', 'status', 'total', 'order_items', 'delivery_address',
                   'created_at', 'updated_at', 'use_new_address')
-        read_only_fields = ('status',)
-
+        read_only_fields = ('status', 'total')
+
+    def validate_order_items(self, order_items):
+        """Reject empty orders, repeated, missing and out of stock products with one query."""
+        if not order_items:
+            raise ValidationError('Order must have at least one item.')
+
+        product_ids = [item['product_id'] for item in order_items]
+        products = Product.objects.only('id', 'price', 'quantity', 'is_sharded_stock').in_bulk(product_ids)
+
+        errors = []
+        seen = set()
+        for item in order_items:
+            product = products.get(item['product_id'])
+            if product is None:
+                errors.append({'product': f'Invalid pk "{item["product_id"]}" - object does not exist.'})
+            elif item['product_id'] in seen:
+                errors.append({'product': 'Product already exists in your order.'})
+            # Sharded stock is only checked when it is taken, `quantity` is a folded snapshot
+            elif not product.is_sharded_stock and item['quantity'] > product.quantity:
+                errors.append({'quantity': 'Ordered quantity is more than the stock.'})
+            else:
+                item['unit_price'] = product.price
+                errors.append({})
+            seen.add(item['product_id'])
+
+        if any(errors):
+            raise ValidationError(errors)
+        return order_items
+
+    @transaction.atomic
     def create(self, validated_data):
         order_items_data = validated_data.pop('order_items')
         new_address_data = validated_data.pop('delivery_address', False)
         use_new_address = validated_data.pop('use_new_address', False)
-        order = Order.objects.create(**validated_data)
 
-        for item_data in order_items_data:
-            product = item_data['product']
-            OrderItem.objects.create(order=order, **item_data)
+        # Stock is taken first, a short line rolls back the whole order
+        reserve_stock(get_order_quantities(order_items_data))
+        total = sum(item_data['quantity'] * item_data['unit_price'] for item_data in order_items_data)
+        order = Order.objects.create(total=round(total, 2), **validated_data)
 
-            product.quantity = product.quantity - item_data['quantity']
-            product.save()
+        OrderItem.objects.bulk_create([OrderItem(order=order, **item_data) for item_data in order_items_data])
 
         if use_new_address and new_address_data:
             DeliveryAddress.objects.create(order=order, **new_address_data)
@@ -94,6 +116,35 @@ class CreateOrderSerializer(ModelSerializer):
         return order
 
 
+class QueuedOrderSerializer(serializers.Serializer):
+    """
+    Order request of a queued checkout, checked without touching the database.
+    Products and stock are validated by the checkout worker.
+    """
+    order_items = CreateOrderItemSerializer(many=True, allow_empty=False)
+    delivery_address = DeliveryAddressSerializer(required=False)
+    use_new_address = serializers.BooleanField(default=False)
+
+    def get_payload(self) -> dict:
+        """The request in the CreateOrderSerializer input format."""
+        payload = {
+            'order_items': [
+                {'product': item['product_id'], 'quantity': item['quantity']}
+                for item in self.validated_data['order_items']
+            ],
+            'use_new_address': self.validated_data['use_new_address'],
+        }
+        if 'delivery_address' in self.validated_data:
+            payload['delivery_address'] = dict(self.validated_data['delivery_address'])
+        return payload
+
+
+class CheckoutJobSerializer(ModelSerializer):
+    class Meta:
+        model = CheckoutJob
+        fields = ('id', 'status', 'order', 'errors', 'created_at', 'updated_at')
+
+
 class OrderSerializer(ModelSerializer):
     order_items = OrderItemSerializer(many=True)
     order_address = DeliveryAddressSerializer()
@@ -123,7 +174,17 @@ class OrderStatusSerializer(ModelSerializer):
         return instance
 
 
+class BatchOrderStatusSerializer(serializers.Serializer):
+    """Target status for a wave of orders."""
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000
+    )
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+
 class OrderListSerializer(ModelSerializer):
+    item_count = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Order
-        fields = '__all__'
+        fields = ('id', 'buyer', 'status', 'total', 'item_count', 'created_at', 'updated_at')
@@ -0,0 +1,136 @@
+import logging
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from order.models import CheckoutJob
+from order.serializers import CreateOrderSerializer
+
+CHECKOUT_BATCH_SIZE = 50
+# A job still processing after this long belongs to a dead worker and is queued again
+CHECKOUT_JOB_TIMEOUT = timedelta(minutes=5)
+CHECKOUT_MAX_ATTEMPTS = 3
+CHECKOUT_ERROR = {'message': 'Checkout could not be processed.'}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_job_id(job_id) -> int:
+    try:
+        job_id = int(job_id)
+    except (ValueError, TypeError):
+        raise ValidationError({
+            'error': {'id': 'You should give a number!'}
+        })
+
+    if not job_id:
+        raise ValidationError('Checkout job id must be given')
+    return job_id
+
+
+def enqueue_checkout(buyer, payload: dict) -> CheckoutJob:
+    return CheckoutJob.objects.create(buyer=buyer, payload=payload)
+
+
+@transaction.atomic
+def claim_checkout_jobs(batch_size: int = CHECKOUT_BATCH_SIZE) -> list:
+    """
+    Take the oldest queued jobs for this worker.
+    SKIP LOCKED lets concurrent workers claim different jobs without waiting.
+    """
+    ids = list(CheckoutJob.objects.filter(status=CheckoutJob.QUEUED).select_for_update(
+        skip_locked=True
+    ).order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    CheckoutJob.objects.filter(id__in=ids).update(
+        status=CheckoutJob.PROCESSING, started_at=timezone.now(), attempts=F('attempts') + 1
+    )
+    return list(CheckoutJob.objects.filter(id__in=ids).select_related('buyer__address').order_by('id'))
+
+
+class CheckoutJobLost(Exception):
+    """The job was queued again and claimed by another worker while this one held it."""
+
+
+def _owned_job(job: CheckoutJob):
+    """The job row, as long as it is still the claim of this worker."""
+    return CheckoutJob.objects.filter(id=job.id, status=CheckoutJob.PROCESSING, attempts=job.attempts)
+
+
+def _store_job_result(job: CheckoutJob, status: str, errors=None, order=None) -> None:
+    if not _owned_job(job).update(status=status, errors=errors, order=order, updated_at=timezone.now()):
+        raise CheckoutJobLost(job.id)
+    job.status, job.errors, job.order = status, errors, order
+
+
+def _store_failure(job: CheckoutJob, status: str, errors) -> None:
+    try:
+        _store_job_result(job, status, errors)
+    except CheckoutJobLost:
+        logger.warning('Checkout job %s was claimed by another worker', job.id)
+
+
+def process_checkout_job(job: CheckoutJob) -> CheckoutJob:
+    """
+    Create the order of a claimed job with the CreateOrderSerializer semantics.
+    The order and the job result are committed together, a worker that dies
+    halfway leaves no order behind and the job is queued again.
+    Every write is guarded by the claim, a job that went stale and was claimed
+    again by another worker is left to that worker and no order is created.
+    Invalid jobs fail, jobs hitting any other error are queued again
+    until CHECKOUT_MAX_ATTEMPTS.
+    """
+    # The timeout runs from the start of this job, not from the claim of its batch
+    if not _owned_job(job).update(started_at=timezone.now()):
+        logger.warning('Checkout job %s was claimed by another worker', job.id)
+        return job
+
+    serializer = CreateOrderSerializer(data=job.payload, context={'request': SimpleNamespace(user=job.buyer)})
+    try:
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            _store_job_result(job, CheckoutJob.DONE, order=serializer.save())
+    except CheckoutJobLost:
+        logger.warning('Checkout job %s was claimed by another worker, its order is rolled back', job.id)
+        return job
+    except ValidationError as error:
+        _store_failure(job, CheckoutJob.FAILED, error.detail)
+    except Exception:
+        # An unexpected error may be transient, the job is retried until it is out of attempts
+        logger.exception('Checkout job %s failed', job.id)
+        status = CheckoutJob.FAILED if job.attempts >= CHECKOUT_MAX_ATTEMPTS else CheckoutJob.QUEUED
+        _store_failure(job, status, CHECKOUT_ERROR)
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """Queue again the jobs of dead workers, fail those out of attempts."""
+    stale = CheckoutJob.objects.filter(
+        status=CheckoutJob.PROCESSING, started_at__lt=timezone.now() - CHECKOUT_JOB_TIMEOUT
+    )
+    failed = stale.filter(attempts__gte=CHECKOUT_MAX_ATTEMPTS).update(
+        status=CheckoutJob.FAILED, errors=CHECKOUT_ERROR
+    )
+    return stale.update(status=CheckoutJob.QUEUED) + failed
+
+
+def drain_checkout_queue(batch_size: int = CHECKOUT_BATCH_SIZE) -> int:
+    """Process queued jobs batch by batch until the queue is empty, returns the processed count."""
+    processed = 0
+    while True:
+        jobs = claim_checkout_jobs(batch_size)
+        if not jobs:
+            return processed
+        for job in jobs:
+            try:
+                process_checkout_job(job)
+            except Exception:
+                # The result could not be stored, the job is queued again once it is stale
+                logger.exception('Checkout job %s could not be stored', job.id)
+        processed += len(jobs)
@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.utils import timezone
+
+from order.models import Order
+
+# Cancelled and delivered orders are final, as in OrderStatusSerializer
+FINAL_STATUSES = (Order.CANCELLED, Order.DELIVERED)
+
+
+def get_allowed_sources(target: str) -> list:
+    """Statuses an order can be moved to `target` from."""
+    return [status for status, _ in Order.STATUS_CHOICES if status not in FINAL_STATUSES and status != target]
+
+
+@transaction.atomic
+def transition_orders(order_ids, target: str) -> dict:
+    """
+    Move orders to `target` in two statements whatever their number: the movable
+    orders are locked in id order, then changed by one UPDATE conditional on
+    their status. Returns the moved and the rejected (missing or not allowed) ids.
+    """
+    order_ids = sorted(set(order_ids))
+    allowed = get_allowed_sources(target)
+
+    moved = list(Order.objects.filter(id__in=order_ids, status__in=allowed).select_for_update().order_by(
+        'id'
+    ).values_list('id', flat=True))
+    if moved:
+        Order.objects.filter(id__in=moved, status__in=allowed).update(status=target, updated_at=timezone.now())
+
+    moved_ids = set(moved)
+    return {
+        'moved': moved,
+        'rejected': [order_id for order_id in order_ids if order_id not in moved_ids],
+    }
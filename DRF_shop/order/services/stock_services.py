@@ -0,0 +1,74 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from product.models import Product
+from product.services.product_cache import invalidate_products
+from product.services.stock_shard_services import take_sharded_stock
+
+
+def reserve_stock(quantities) -> None:
+    """
+    Take `{product_id: quantity}` from stock, all or nothing.
+    The product rows are locked with one SELECT ... FOR UPDATE in ascending
+    id order, so concurrent multi-item orders cannot deadlock. Stock is then
+    checked in memory and taken by one set-based UPDATE.
+    Products with sharded stock are taken from their counters instead,
+    their product row is not locked.
+    Raises ValidationError, rolling back the enclosing transaction, when any product is short.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError('reserve_stock() must run inside a transaction.')
+
+    product_ids = sorted(quantities)
+    # `in_bulk()` would drop the ORDER BY, the rows are mapped by id in Python instead
+    locked = {product.id: product for product in Product.objects.filter(
+        id__in=product_ids, is_sharded_stock=False
+    ).select_for_update().only('id', 'quantity').order_by('id')}
+
+    # Products that were not locked are sharded or gone, only then they are looked up
+    sharded = set()
+    if len(locked) < len(product_ids):
+        sharded = set(Product.objects.filter(
+            id__in=[product_id for product_id in product_ids if product_id not in locked], is_sharded_stock=True
+        ).values_list('id', flat=True))
+
+    short = []
+    for product_id in product_ids:
+        if product_id in locked:
+            reserved = locked[product_id].quantity >= quantities[product_id]
+        elif product_id in sharded:
+            reserved = take_sharded_stock(product_id, quantities[product_id])
+        else:
+            reserved = False
+        if not reserved:
+            short.append(product_id)
+
+    if short:
+        raise ValidationError({
+            'quantity': 'Ordered quantity is more than the stock.',
+            'products': short,
+        })
+
+    if locked:
+        Product.objects.filter(id__in=list(locked)).update(
+            quantity=F('quantity') - Case(
+                *[When(id=product_id, then=Value(quantities[product_id])) for product_id in locked],
+                output_field=IntegerField()
+            ),
+            updated_at=timezone.now()
+        )
+        # Stock is part of the cached product payloads, sharded stock shows up when folded
+        locked_ids = list(locked)
+        transaction.on_commit(lambda: invalidate_products(locked_ids))
+
+
+def get_order_quantities(order_items_data) -> Counter:
+    """Ordered quantity per product id, repeated lines are summed."""
+    quantities = Counter()
+    for item_data in order_items_data:
+        quantities[item_data['product_id']] += item_data['quantity']
+    return quantities
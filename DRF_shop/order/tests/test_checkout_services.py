@@ -0,0 +1,171 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.db.models import F
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from order.models import CheckoutJob, Order
+from order.serializers import CreateOrderSerializer
+from order.services.checkout_services import (
+    CHECKOUT_JOB_TIMEOUT, CHECKOUT_MAX_ATTEMPTS, claim_checkout_jobs, drain_checkout_queue, enqueue_checkout,
+    process_checkout_job, requeue_stale_jobs
+)
+from product.models import Product
+from product.tests.test_views import create_category_test_data, create_subcategory_test_data
+
+User = get_user_model()
+
+ADDRESS = {
+    'city': 'test_city', 'street_address': 'test_street',
+    'apartment_address': 'test_apart', 'postal_code': 'test_code'
+}
+
+
+def create_checkout_test_data(quantity: int = 5):
+    user = User.objects.create(email='buyer@test.com', password='12345678', is_confirmed_email=True)
+    product = Product.objects.create(
+        name='Phone', brand='Brand', description='test', price=10, quantity=quantity,
+        category=create_subcategory_test_data(create_category_test_data())
+    )
+    return user, product
+
+
+def checkout_payload(product, quantity: int = 1) -> dict:
+    return {
+        'delivery_address': ADDRESS, 'use_new_address': True,
+        'order_items': [{'product': product.id, 'quantity': quantity}]
+    }
+
+
+class TestQueuedCheckout(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('order_create_queued')
+        cls.user, cls.product = create_checkout_test_data()
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+    def test_accepts_and_processes_checkout(self):
+        response = self.client.post(self.url, data=checkout_payload(self.product, 2), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response['Location'], response.data['status_url'])
+        self.assertEqual(response.data['status'], CheckoutJob.QUEUED)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.client.get(response.data['status_url']).data['status'], CheckoutJob.QUEUED)
+
+        self.assertEqual(drain_checkout_queue(), 1)
+
+        job = self.client.get(response.data['status_url']).data
+        self.assertEqual(job['status'], CheckoutJob.DONE)
+        self.assertEqual(Order.objects.get(id=job['order']).total, 20)
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 3)
+
+    def test_invalid_request_is_rejected_without_queueing(self):
+        payload = checkout_payload(self.product)
+        payload['order_items'] = []
+
+        response = self.client.post(self.url, data=payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CheckoutJob.objects.exists())
+
+    def test_short_stock_fails_job(self):
+        job = enqueue_checkout(self.user, checkout_payload(self.product, 6))
+
+        drain_checkout_queue()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CheckoutJob.FAILED)
+        self.assertIn('order_items', job.errors)
+        self.assertFalse(Order.objects.exists())
+
+    def test_unexpected_error_requeues_job_and_keeps_draining(self):
+        failing = enqueue_checkout(self.user, checkout_payload(self.product, 1))
+        job = enqueue_checkout(self.user, checkout_payload(self.product, 2))
+        save = CreateOrderSerializer.save
+
+        def save_or_fail(serializer, **kwargs):
+            if serializer.validated_data['order_items'][0]['quantity'] == 1:
+                raise IntegrityError('boom')
+            return save(serializer, **kwargs)
+
+        with mock.patch.object(CreateOrderSerializer, 'save', autospec=True, side_effect=save_or_fail):
+            with self.assertLogs('order.services.checkout_services', 'ERROR'):
+                self.assertEqual(drain_checkout_queue(batch_size=1), CHECKOUT_MAX_ATTEMPTS + 1)
+
+        job.refresh_from_db()
+        failing.refresh_from_db()
+        self.assertEqual(job.status, CheckoutJob.DONE)
+        self.assertEqual(failing.status, CheckoutJob.FAILED)
+        self.assertEqual(failing.attempts, CHECKOUT_MAX_ATTEMPTS)
+        self.assertEqual(failing.errors, {'message': 'Checkout could not be processed.'})
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 3)
+
+    def test_job_claimed_again_is_skipped(self):
+        job = enqueue_checkout(self.user, checkout_payload(self.product))
+        claimed, = claim_checkout_jobs()
+        # Went stale before it started and another worker claimed it again
+        CheckoutJob.objects.filter(id=job.id).update(attempts=F('attempts') + 1)
+
+        with self.assertLogs('order.services.checkout_services', 'WARNING'):
+            process_checkout_job(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CheckoutJob.PROCESSING)
+        self.assertFalse(Order.objects.exists())
+
+    def test_job_lost_while_processing_rolls_back_order(self):
+        job = enqueue_checkout(self.user, checkout_payload(self.product, 2))
+        claimed, = claim_checkout_jobs()
+        save = CreateOrderSerializer.save
+
+        def save_and_lose_job(serializer, **kwargs):
+            order = save(serializer, **kwargs)
+            CheckoutJob.objects.filter(id=job.id).update(status=CheckoutJob.QUEUED)
+            return order
+
+        with mock.patch.object(CreateOrderSerializer, 'save', autospec=True, side_effect=save_and_lose_job):
+            with self.assertLogs('order.services.checkout_services', 'WARNING'):
+                process_checkout_job(claimed)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 5)
+
+    def test_status_requires_numeric_id(self):
+        self.assertEqual(self.client.get(reverse('checkout_status'), {'id': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('checkout_status')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('checkout_status'), {'id': 999999}).status_code, 404)
+
+    def test_stale_jobs_are_queued_again(self):
+        job = enqueue_checkout(self.user, checkout_payload(self.product))
+        claim_checkout_jobs()
+        CheckoutJob.objects.filter(id=job.id).update(started_at=timezone.now() - CHECKOUT_JOB_TIMEOUT - timedelta(1))
+
+        self.assertEqual(claim_checkout_jobs(), [])
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual([claimed.id for claimed in claim_checkout_jobs()], [job.id])
+
+
+class TestCheckoutWorkers(TransactionTestCase):
+    def test_worker_processes_drain_queue(self):
+        user, product = create_checkout_test_data(quantity=15)
+        for _ in range(20):
+            enqueue_checkout(user, checkout_payload(product))
+
+        call_command('run_checkout_workers', processes=2, batch_size=3, once=True, stdout=StringIO())
+
+        self.assertEqual(CheckoutJob.objects.filter(status=CheckoutJob.DONE).count(), 15)
+        self.assertEqual(CheckoutJob.objects.filter(status=CheckoutJob.FAILED).count(), 5)
+        self.assertEqual(Order.objects.count(), 15)
+        self.assertEqual(Product.objects.get(id=product.id).quantity, 0)
@@ -0,0 +1,220 @@
+import itertools
+import threading
+from io import StringIO
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+from django.core.management import call_command
+
+from order.services.stock_services import reserve_stock
+from product.models import Product, ProductStockShard
+from product.serializers import UpdateProductSerializer
+from product.services.product_services import batch_update_products
+from product.services.stock_shard_services import (
+    fold_stock_shards, shard_product_stock, split_stock, unshard_product_stock
+)
+from product.tests.test_views import create_category_test_data, create_subcategory_test_data
+
+STRESS_THREADS = 24
+
+
+def create_stock_test_data(quantities) -> list:
+    sub_category = create_subcategory_test_data(create_category_test_data())
+    return [
+        Product.objects.create(
+            name=f'Product {i}', brand='Brand', description='test', quantity=quantity, category=sub_category
+        )
+        for i, quantity in enumerate(quantities)
+    ]
+
+
+class TestReserveStock(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second = create_stock_test_data((5, 1))
+
+    def test_reserves_all_lines(self):
+        with transaction.atomic():
+            reserve_stock({self.first.id: 5, self.second.id: 1})
+
+        self.assertEqual(Product.objects.get(id=self.first.id).quantity, 0)
+        self.assertEqual(Product.objects.get(id=self.second.id).quantity, 0)
+
+    def test_short_line_fails_whole_order(self):
+        with self.assertRaises(ValidationError) as error:
+            with transaction.atomic():
+                reserve_stock({self.first.id: 2, self.second.id: 2})
+
+        self.assertEqual(error.exception.detail['products'], [str(self.second.id)])
+        self.assertEqual(Product.objects.get(id=self.first.id).quantity, 5)
+
+    def test_rows_are_locked_in_id_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                reserve_stock({self.second.id: 1, self.first.id: 1})
+
+        lock_query, = [query['sql'] for query in queries.captured_queries if 'FOR UPDATE' in query['sql']]
+        self.assertIn('ORDER BY "product"."id" ASC', lock_query)
+
+
+class TestShardedStock(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product, = create_stock_test_data((10,))
+
+    def setUp(self) -> None:
+        shard_product_stock(self.product.id, shards=4)
+
+    def shard_quantities(self) -> list:
+        return list(ProductStockShard.objects.filter(product=self.product).order_by('shard').values_list(
+            'quantity', flat=True
+        ))
+
+    def test_split_stock(self):
+        self.assertEqual(split_stock(10, 4), [3, 3, 2, 2])
+        self.assertEqual(self.shard_quantities(), [3, 3, 2, 2])
+
+    def test_reserve_from_one_shard(self):
+        with transaction.atomic():
+            reserve_stock({self.product.id: 2})
+
+        self.assertEqual(sum(self.shard_quantities()), 8)
+        # The product row is not touched until the counters are folded
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 10)
+        self.assertEqual(fold_stock_shards(), 1)
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 8)
+        self.assertEqual(fold_stock_shards(), 0)
+
+    def test_reserve_across_shards(self):
+        with transaction.atomic():
+            reserve_stock({self.product.id: 9})
+
+        self.assertEqual(sum(self.shard_quantities()), 1)
+
+    def test_short_sharded_line(self):
+        with self.assertRaises(ValidationError):
+            with transaction.atomic():
+                reserve_stock({self.product.id: 11})
+
+        self.assertEqual(sum(self.shard_quantities()), 10)
+
+    def test_unshard(self):
+        with transaction.atomic():
+            reserve_stock({self.product.id: 4})
+
+        product = unshard_product_stock(self.product.id)
+
+        self.assertEqual(product.quantity, 6)
+        self.assertFalse(product.is_sharded_stock)
+        self.assertFalse(ProductStockShard.objects.filter(product=self.product).exists())
+
+    def test_quantity_update_resplits_counters(self):
+        serializer = UpdateProductSerializer(Product.objects.get(id=self.product.id), data={'quantity': 20}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertEqual(self.shard_quantities(), [5, 5, 5, 5])
+        self.assertEqual(fold_stock_shards(), 0)
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 20)
+
+    def test_batch_quantity_update_resplits_counters(self):
+        batch_update_products([{'id': self.product.id, 'quantity': 6}])
+
+        self.assertEqual(self.shard_quantities(), [2, 2, 1, 1])
+        fold_stock_shards()
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 6)
+
+    def test_commands(self):
+        call_command('shard_stock', self.product.id, shards=2, stdout=StringIO())
+        call_command('fold_stock_shards', stdout=StringIO())
+
+        self.assertEqual(self.shard_quantities(), [5, 5])
+        self.assertEqual(Product.objects.get(id=self.product.id).quantity, 10)
+
+
+class TestReserveStockConcurrency(TransactionTestCase):
+    """Concurrent checkouts on real connections, stock must never go below zero."""
+
+    def run_concurrently(self, orders) -> list:
+        barrier = threading.Barrier(len(orders))
+        results = [None] * len(orders)
+
+        def checkout(index, quantities):
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    reserve_stock(quantities)
+                results[index] = True
+            except ValidationError:
+                results[index] = False
+            except Exception as error:
+                results[index] = error
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=item) for item in enumerate(orders)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_no_oversell(self):
+        product, = create_stock_test_data((10,))
+
+        results = self.run_concurrently([{product.id: 1}] * STRESS_THREADS)
+
+        self.assertEqual(results.count(True), 10)
+        self.assertEqual(results.count(False), STRESS_THREADS - 10)
+        self.assertEqual(Product.objects.get(id=product.id).quantity, 0)
+
+    def test_multi_item_orders_do_not_deadlock(self):
+        first, second = create_stock_test_data((STRESS_THREADS, STRESS_THREADS // 2))
+        # Half of the orders list the products in the opposite order
+        orders = [
+            {first.id: 1, second.id: 1} if i % 2 else {second.id: 1, first.id: 1}
+            for i in range(STRESS_THREADS)
+        ]
+
+        results = self.run_concurrently(orders)
+
+        self.assertTrue(all(result in (True, False) for result in results), results)
+        self.assertEqual(results.count(True), STRESS_THREADS // 2)
+        self.assertEqual(Product.objects.get(id=first.id).quantity, STRESS_THREADS // 2)
+        self.assertEqual(Product.objects.get(id=second.id).quantity, 0)
+
+    def test_many_products_in_any_order_do_not_deadlock(self):
+        products = create_stock_test_data((STRESS_THREADS,) * 4)
+        # Every order lists the same four products in a different order
+        orders = [
+            {product.id: 1 for product in permutation}
+            for permutation in itertools.islice(itertools.permutations(products), STRESS_THREADS)
+        ]
+
+        results = self.run_concurrently(orders)
+
+        self.assertEqual(results, [True] * STRESS_THREADS)
+        self.assertEqual(
+            list(Product.objects.filter(id__in=[product.id for product in products]).values_list('quantity', flat=True)),
+            [0] * 4
+        )
+
+    def test_sharded_stock_no_oversell(self):
+        product, = create_stock_test_data((10,))
+        shard_product_stock(product.id, shards=4)
+
+        results = self.run_concurrently([{product.id: 1}] * STRESS_THREADS)
+        fold_stock_shards()
+
+        self.assertEqual(results.count(True), 10)
+        self.assertEqual(Product.objects.get(id=product.id).quantity, 0)
+        self.assertFalse(ProductStockShard.objects.filter(quantity__lt=0).exists())
+
+    def test_requires_transaction(self):
+        product, = create_stock_test_data((1,))
+
+        with self.assertRaises(RuntimeError):
+            reserve_stock({product.id: 1})
@@ -1,11 +1,17 @@
 import json
 import copy
+import importlib
+from decimal import Decimal
+from types import SimpleNamespace
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import AccessToken
 
+from core.testing import QueryBudgetMixin
 from customer.tests.test_views import create_staff_user_test_data
 from product.models import Product
 from product.tests.test_views import create_category_test_data, create_subcategory_test_data, create_product_test_data
@@ -75,20 +81,21 @@ class TestOrderViews(APITestCase):
         data = copy.deepcopy(self.create_order_data)
         data['use_new_address'] = False
         data.pop('delivery_address')
-        # CREATE ADDRESS FOR USER
-        address = self.user.address
-        address.city = 'test_city'
-        address.street_address = 'test_street'
-        address.apartment_address = 'test_apart'
-        address.postal_code = 'test_code'
-        address.save()
+        # CREATE ADDRESS FOR USER, committing it refreshes the cached user
+        with self.captureOnCommitCallbacks(execute=True):
+            address = self.user.address
+            address.city = 'test_city'
+            address.street_address = 'test_street'
+            address.apartment_address = 'test_apart'
+            address.postal_code = 'test_code'
+            address.save()
 
         response_without_new_address = self.client.post(
             self.order_create_url, data=json.dumps(data), content_type="application/json",
             HTTP_AUTHORIZATION=f"Bearer {str(self.token)}"
         )
 
-        order = Order.objects.get(id=2)
+        order = Order.objects.get(id=response_without_new_address.data['id'])
         self.assertEqual(response_without_new_address.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response_with_new_address.status_code, status.HTTP_201_CREATED)
         self.assertTrue(DeliveryAddress.objects.filter(order=order).exists())
@@ -121,7 +128,7 @@ class TestOrderViews(APITestCase):
 
     def test_order_detail_valid_data(self):
         response = self.client.get(
-            path=self.order_details_url + '?id=1', HTTP_AUTHORIZATION=f"Bearer {str(self.token)}"
+            path=self.order_details_url + f'?id={self.order.id}', HTTP_AUTHORIZATION=f"Bearer {str(self.token)}"
         )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -139,3 +146,228 @@ class TestOrderViews(APITestCase):
         )
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TestCreateOrderQueries(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='buyer@test.com', password='12345678', is_confirmed_email=True)
+        cls.order_create_url = reverse('order_create')
+        sub_category = create_subcategory_test_data(create_category_test_data())
+        cls.products = Product.objects.bulk_create([
+            Product(name=f'Product {i}', brand='Brand', description='test', quantity=5, category=sub_category)
+            for i in range(50)
+        ])
+
+    def create_order(self, products, quantity=1):
+        data = {
+            'delivery_address': {
+                'city': 'test_city', 'street_address': 'test_street',
+                'apartment_address': 'test_apart', 'postal_code': 'test_code'
+            },
+            'use_new_address': True,
+            'order_items': [{'product': product.id, 'quantity': quantity} for product in products]
+        }
+        self.client.force_authenticate(user=self.user)
+        return self.client.post(self.order_create_url, data=data, format='json')
+
+    def test_fifty_item_order_runs_constant_queries(self):
+        # Validation read, savepoint, stock lock, stock update, order, items,
+        # address, release savepoint and the created items of the response
+        with self.assertNumQueries(9):
+            response = self.create_order(self.products)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['order_items']), 50)
+        self.assertEqual(OrderItem.objects.filter(order_id=response.data['id']).count(), 50)
+        self.assertFalse(Product.objects.exclude(quantity=4).exists())
+
+    def test_single_item_order_runs_same_queries(self):
+        with self.assertNumQueries(9):
+            self.create_order(self.products[:1])
+
+    def test_invalid_items(self):
+        duplicate = self.create_order([self.products[0], self.products[0]])
+        short = self.create_order(self.products[:2], quantity=6)
+
+        self.assertEqual(duplicate.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(duplicate.data['order_items'][1]['product'], 'Product already exists in your order.')
+        self.assertEqual(short.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+
+class TestOrderTotals(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='buyer@test.com', password='12345678', is_confirmed_email=True)
+        cls.order_create_url = reverse('order_create')
+        sub_category = create_subcategory_test_data(create_category_test_data())
+        cls.phone = Product.objects.create(name='Phone', brand='Brand', description='test', price='999.99',
+                                           quantity=5, category=sub_category)
+        cls.case = Product.objects.create(name='Case', brand='Brand', description='test', price='10.50',
+                                          quantity=5, category=sub_category)
+
+    def test_checkout_stores_prices_and_total(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.order_create_url, data={
+            'delivery_address': {
+                'city': 'test_city', 'street_address': 'test_street',
+                'apartment_address': 'test_apart', 'postal_code': 'test_code'
+            },
+            'use_new_address': True,
+            'order_items': [{'product': self.phone.id, 'quantity': 1}, {'product': self.case.id, 'quantity': 2}]
+        }, format='json')
+        Product.objects.filter(id=self.phone.id).update(price=1)
+
+        order = Order.objects.get(id=response.data['id'])
+        self.assertEqual(response.data['total'], '1020.99')
+        self.assertEqual(order.total_cost, Decimal('1020.99'))
+        self.assertEqual(order.order_items.get(product=self.phone).cost, Decimal('999.99'))
+
+    def test_backfill_migration(self):
+        order = create_order_test_data(self.user)
+        OrderItem.objects.create(order=order, product=self.phone, quantity=2)
+        OrderItem.objects.create(order=order, product=self.case, quantity=1)
+        empty_order = create_order_test_data(self.user)
+
+        migration = importlib.import_module('order.migrations.0003_backfill_order_totals')
+        migration.backfill_order_totals(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(Order.objects.get(id=order.id).total, Decimal('2010.48'))
+        self.assertEqual(Order.objects.get(id=empty_order.id).total, Decimal('0'))
+
+
+class TestOrderHistory(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.order_all_url = reverse('order_all')
+        cls.user = User.objects.create(email='buyer@test.com', password='12345678')
+        cls.other_user = User.objects.create(email='other@test.com', password='12345678')
+        product = create_product_test_data(create_subcategory_test_data(create_category_test_data()))
+        cls.orders = [Order.objects.create(buyer=cls.user, total=i) for i in range(15)]
+        for _ in range(3):
+            OrderItem.objects.create(order=cls.orders[-1], product=product, quantity=1, unit_price=1)
+        create_order_test_data(cls.other_user)
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+    def test_history_is_scoped_and_paginated(self):
+        with self.assertNumQueries(1):
+            first_page = self.client.get(self.order_all_url)
+        second_page = self.client.get(first_page.data['next'])
+
+        ids = [order['id'] for order in first_page.data['results'] + second_page.data['results']]
+        self.assertEqual(ids, [order.id for order in reversed(self.orders)])
+        self.assertIsNone(second_page.data['next'])
+
+    def test_item_count_and_total(self):
+        newest = self.client.get(self.order_all_url).data['results'][0]
+
+        self.assertEqual(newest['item_count'], 3)
+        self.assertEqual(newest['total'], '14.00')
+        self.assertEqual(self.client.get(self.order_all_url).data['results'][1]['item_count'], 0)
+
+
+class TestOrderQueryBudgets(QueryBudgetMixin, APITestCase):
+    """Every order endpoint stays within its declared number of queries, whatever the order size."""
+    query_budgets = {
+        'order_create': 9,
+        'order_create_queued': 1,
+        'checkout_status': 1,
+        'order_status_update': 2,
+        'order_status_batch_update': 4,
+        'order_all': 1,
+        'order_details': 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff_user = create_staff_user_test_data()
+        cls.user = User.objects.create(email='buyer@test.com', password='12345678', is_confirmed_email=True)
+        sub_category = create_subcategory_test_data(create_category_test_data())
+        cls.products = Product.objects.bulk_create([
+            Product(name=f'Product {i}', brand='Brand', description='test', quantity=5, category=sub_category)
+            for i in range(20)
+        ])
+        cls.order = create_order_test_data(cls.user)
+        create_delivery_address_test_data(cls.order)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=cls.order, product=product, quantity=1, unit_price=product.price)
+            for product in cls.products
+        ])
+
+    def request(self, name, method='get', data=None, user=None):
+        self.client.force_authenticate(user=user or self.user)
+        with self.assertQueryBudget(self.query_budgets[name], name):
+            response = getattr(self.client, method)(reverse(name), data=data, format='json')
+        self.assertLess(response.status_code, 400, response.data)
+        return response
+
+    def test_every_endpoint_has_budget(self):
+        self.assertBudgetsCoverUrls(self.query_budgets, 'order.urls')
+
+    def test_order_reads(self):
+        self.request('order_all')
+        response = self.request('order_details', data={'id': self.order.id})
+
+        self.assertEqual(len(response.data['order_items']), 20)
+
+    def test_order_writes(self):
+        self.request('order_create', 'post', {
+            'delivery_address': {
+                'city': 'test_city', 'street_address': 'test_street',
+                'apartment_address': 'test_apart', 'postal_code': 'test_code'
+            },
+            'use_new_address': True,
+            'order_items': [{'product': product.id, 'quantity': 1} for product in self.products]
+        })
+        response = self.request('order_create_queued', 'post', {
+            'delivery_address': {
+                'city': 'test_city', 'street_address': 'test_street',
+                'apartment_address': 'test_apart', 'postal_code': 'test_code'
+            },
+            'use_new_address': True,
+            'order_items': [{'product': product.id, 'quantity': 1} for product in self.products]
+        })
+        self.request('checkout_status', data={'id': response.data['job_id']})
+        self.request('order_status_update', 'patch', {'order_id': self.order.id, 'status': 'S'}, user=self.staff_user)
+        self.request('order_status_batch_update', 'patch', {
+            'order_ids': [self.order.id] + list(range(10 ** 6, 10 ** 6 + 500)), 'status': 'D'
+        }, user=self.staff_user)
+
+
+class TestBatchOrderStatus(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('order_status_batch_update')
+        cls.staff_user = create_staff_user_test_data()
+        cls.user = User.objects.create(email='buyer@test.com', password='12345678')
+        cls.pending = [create_order_test_data(cls.user) for _ in range(3)]
+        cls.cancelled = Order.objects.create(buyer=cls.user, status=Order.CANCELLED)
+        cls.delivered = Order.objects.create(buyer=cls.user, status=Order.DELIVERED)
+
+    def transition(self, order_ids, target, user=None):
+        self.client.force_authenticate(user=user or self.staff_user)
+        return self.client.patch(self.url, data={'order_ids': order_ids, 'status': target}, format='json')
+
+    def test_moves_allowed_and_rejects_final_orders(self):
+        ids = [order.id for order in self.pending] + [self.cancelled.id, self.delivered.id, 10 ** 6]
+
+        response = self.transition(ids, Order.SHIPPED)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['moved'], [order.id for order in self.pending])
+        self.assertEqual(response.data['rejected'], [self.cancelled.id, self.delivered.id, 10 ** 6])
+        self.assertEqual(Order.objects.filter(status=Order.SHIPPED).count(), 3)
+        self.assertEqual(Order.objects.get(id=self.cancelled.id).status, Order.CANCELLED)
+
+    def test_same_status_is_rejected(self):
+        response = self.transition([self.pending[0].id], Order.PENDING)
+
+        self.assertEqual(response.data['rejected'], [self.pending[0].id])
+
+    def test_invalid_payload_and_permissions(self):
+        self.assertEqual(self.transition([], Order.SHIPPED).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.transition([1], 'X').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.transition([1], Order.SHIPPED, user=self.user).status_code, status.HTTP_403_FORBIDDEN)
@@ -4,7 +4,11 @@ from order import views
 
 urlpatterns = [
     path('order/create/', views.CreateOrderAPIView.as_view(), name='order_create'),
+    path('order/create/queued/', views.QueuedCreateOrderAPIView.as_view(), name='order_create_queued'),
+    path('order/checkout/status/', views.CheckoutStatusAPIView.as_view(), name='checkout_status'),
     path('order/update-status/', views.UpdateOrderStatusAPIView.as_view(), name='order_status_update'),
+    path('order/update-status/batch/', views.BatchUpdateOrderStatusAPIView.as_view(),
+         name='order_status_batch_update'),
     path('order/all/', views.GetOrdersListAPIView.as_view(), name='order_all'),  # all orders of concrete user
     path('order/details/', views.GetOrderAPIView.as_view(), name='order_details'),
 ]
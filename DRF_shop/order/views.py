@@ -3,12 +3,18 @@ from rest_framework.generics import CreateAPIView, RetrieveAPIView, ListAPIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.contrib.auth import get_user_model
 
-from order.models import Order
+from order.models import CheckoutJob, Order, OrderItem
+from order.pagination import OrderHistoryPagination
+from order.services.checkout_services import enqueue_checkout, parse_job_id
+from order.services.status_services import transition_orders
+from customer.authentication import CachedJWTAuthentication
 from customer.permissions import IsStaffOrSuperuserPermission, HasCompleteAddressPermission, IsEmailVerifiedPermission
 from order import serializers
 
@@ -16,11 +22,46 @@ User = get_user_model()
 
 
 class CreateOrderAPIView(CreateAPIView):
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (IsAuthenticated, HasCompleteAddressPermission, IsEmailVerifiedPermission)
     serializer_class = serializers.CreateOrderSerializer
 
 
+class QueuedCreateOrderAPIView(APIView):
+    """
+    Accept an order for the checkout workers and answer at once with
+    202 Accepted and the URL of the checkout status.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsAuthenticated, HasCompleteAddressPermission, IsEmailVerifiedPermission)
+    serializer_class = serializers.QueuedOrderSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job = enqueue_checkout(request.user, serializer.get_payload())
+        status_url = request.build_absolute_uri(f"{reverse('checkout_status')}?id={job.id}")
+        return Response(
+            {'job_id': job.id, 'status': job.status, 'status_url': status_url},
+            status=status.HTTP_202_ACCEPTED, headers={'Location': status_url}
+        )
+
+
+class CheckoutStatusAPIView(RetrieveAPIView):
+    """
+    Status of a queued checkout of the current user,
+    with the order once it is created or the errors if it failed.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    serializer_class = serializers.CheckoutJobSerializer
+
+    def get_object(self):
+        pk = parse_job_id(self.request.query_params.get('id'))
+        return get_object_or_404(CheckoutJob, buyer=self.request.user, id=pk)
+
+
 class UpdateOrderStatusAPIView(APIView):
     authentication_classes = ()
     permission_classes = (IsStaffOrSuperuserPermission,)
@@ -39,27 +80,53 @@ class UpdateOrderStatusAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BatchUpdateOrderStatusAPIView(APIView):
+    """
+    Move many orders to one status at once.
+    Cancelled and delivered orders are rejected, as are missing ids.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsStaffOrSuperuserPermission,)
+    serializer_class = serializers.BatchOrderStatusSerializer
+
+    def patch(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = transition_orders(serializer.validated_data['order_ids'], serializer.validated_data['status'])
+        return Response(result, status=status.HTTP_200_OK)
+
+
 class GetOrdersListAPIView(ListAPIView):
-    authentication_classes = (JWTAuthentication,)
+    """
+    Orders of the current user, newest first, cursor paginated.
+    Item counts come from a correlated subquery of the same statement.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
     serializer_class = serializers.OrderListSerializer
-    queryset = Order.objects.all()
+    pagination_class = OrderHistoryPagination
 
-    def get_object(self):
-        user_id = self.request.user.id
-        try:
-            self.get_queryset().filter(buyer=user_id)
-        except self.get_queryset().DoesNotExist:
-            return Response(data="Your orders will be here.", status=status.HTTP_404_NOT_FOUND)
+    def get_queryset(self):
+        item_count = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order').annotate(
+            count=Count('id')
+        ).values('count')
+        return Order.objects.filter(buyer=self.request.user).annotate(
+            item_count=Coalesce(Subquery(item_count), 0)
+        )
 
 
 class GetOrderAPIView(RetrieveAPIView):
-    authentication_classes = (JWTAuthentication,)
+    """
+    Order details of the current user in two queries: the order joined with its
+    address and the prefetched items. Money amounts are stored, products are not read.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
     queryset = Order.objects.all()
     serializer_class = serializers.OrderSerializer
 
     def get_object(self):
         pk = self.request.query_params.get('id')
-        return get_object_or_404(self.get_queryset().select_related('order_address'),
-                                 buyer=self.request.user, id=pk)
+        queryset = self.get_queryset().select_related('order_address').prefetch_related('order_items')
+        return get_object_or_404(queryset, buyer=self.request.user, id=pk)
@@ -0,0 +1,56 @@
+import hashlib
+import json
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def get_queryset_etag(queryset, request) -> str:
+    """
+    Weak ETag of a list response from one aggregate over the filtered queryset:
+    the latest `updated_at` and the row count, plus the query string.
+    """
+    state = queryset.order_by().aggregate(last_updated=Max('updated_at'), count=Count('pk'))
+    key = f"{request.get_full_path()}|{state['last_updated']}|{state['count']}"
+    return 'W/"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_content_etag(content, request) -> str:
+    """Weak ETag of a response body that is already at hand, e.g. read from a cache."""
+    key = f"{request.get_full_path()}|{json.dumps(content, sort_keys=True, default=str)}"
+    return 'W/"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET (ETag / Last-Modified) for DRF views.
+    `get_validators` must be cheap: when the client copy is still current the
+    view answers 304 Not Modified before anything is serialized.
+    """
+
+    def get_validators(self, request):
+        """
+        Return an `(etag, last_modified)` pair, either of them may be None.
+        Without validators the request is answered as a plain GET.
+        """
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is None and last_modified is None:
+            return super().get(request, *args, **kwargs)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            if etag:
+                response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Let clients and shared caches store the response but always revalidate it
+            patch_cache_control(response, no_cache=True)
+        return response
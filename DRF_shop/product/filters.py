@@ -0,0 +1,52 @@
+import django_filters
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from product.models import Product
+from product.services.search_services import search_products
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over the product search vector by `?q=`.
+    Results are ordered by relevance unless `?ordering=` is given.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '').strip()
+        if not term:
+            return queryset
+
+        queryset = search_products(queryset, term)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-rank', '-id')
+        return queryset
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    pass
+
+
+class ProductFilter(django_filters.FilterSet):
+    """
+    Product list filters, `?brand=` takes a comma separated list.
+    The lists only show live products, so there is no `is_active` filter.
+    On live products backed by the (category, price), (brand, price)
+    and in-stock partial indexes of Product.
+    """
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    brand = CharInFilter(field_name='brand', lookup_expr='in')
+    sub_category = django_filters.NumberFilter(field_name='category_id')
+    category = django_filters.NumberFilter(field_name='category__category_id')
+    in_stock = django_filters.BooleanFilter(method='filter_in_stock')
+
+    class Meta:
+        model = Product
+        fields = ('min_price', 'max_price', 'brand', 'sub_category', 'category', 'in_stock')
+
+    def filter_in_stock(self, queryset, name, value):
+        if value:
+            return queryset.filter(quantity__gt=0)
+        return queryset.filter(quantity__lte=0)
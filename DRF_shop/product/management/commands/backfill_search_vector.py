@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from product.models import Product
+from product.services.search_services import refresh_search_vector
+
+
+class Command(BaseCommand):
+    help = "Populate Product.search_vector for existing rows in id-ordered chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every product, not only the ones without a search vector.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        queryset = Product.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                total += refresh_search_vector(Product.objects.filter(id__in=ids))
+
+            last_id = ids[-1]
+            self.stdout.write(f"Updated {total} products (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Search vector backfill finished, {total} products updated."))
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from product.models import Category, SubCategory, Product
+from product.serializers import GetProductSerializer
+from product.values_serializers import ValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare GetProductSerializer with the .values() fast path on seeded products. "
+        "Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of N runs.')
+
+    def seed(self, rows: int) -> SubCategory:
+        name = f'benchmark-{time.time_ns()}'
+        category = Category.objects.create(name=name)
+        sub_category = SubCategory.objects.create(category=category, name=name)
+        Product.objects.bulk_create((
+            Product(
+                category=sub_category, name=f'Product {i}', brand=f'Brand {i % 50}',
+                description='Benchmark product', price=f'{i % 10000}.{i % 100:02d}', quantity=i % 7
+            )
+            for i in range(rows)
+        ), batch_size=2000)
+        return sub_category
+
+    def best_of(self, repeat: int, run):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = run()
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
+
+    def handle(self, *args, **options):
+        rows, renderer = options['rows'], JSONRenderer()
+        values_serializer = ValuesSerializer(GetProductSerializer)
+
+        with transaction.atomic():
+            sub_category = self.seed(rows)
+            queryset = Product.objects.filter(category=sub_category).order_by('-created_at', '-id')
+
+            serializer_seconds, serializer_output = self.best_of(options['repeat'], lambda: renderer.render(
+                GetProductSerializer(queryset, many=True).data
+            ))
+            values_seconds, values_output = self.best_of(options['repeat'], lambda: renderer.render(
+                values_serializer.to_representation(values_serializer.get_queryset(queryset))
+            ))
+            transaction.set_rollback(True)
+
+        if serializer_output != values_output:
+            raise CommandError('The fast path output differs from GetProductSerializer.')
+
+        self.stdout.write(f'rows: {rows}, output identical: {len(values_output)} bytes')
+        self.stdout.write(f'GetProductSerializer: {serializer_seconds * 1000:.1f} ms')
+        self.stdout.write(f'ValuesSerializer: {values_seconds * 1000:.1f} ms')
+        self.stdout.write(f'speedup: {serializer_seconds / values_seconds:.1f}x')
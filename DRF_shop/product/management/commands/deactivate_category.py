@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from product.models import Category, SubCategory
+from product.services.cascade_services import (
+    CASCADE_CHUNK_SIZE, deactivate_category, deactivate_sub_category
+)
+
+
+class Command(BaseCommand):
+    help = "Deactivate a category (or a sub category) with all its products in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('name')
+        parser.add_argument('--sub-category', action='store_true', help='The name is a sub category name.')
+        parser.add_argument('--chunk-size', type=int, default=CASCADE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        model = SubCategory if options['sub_category'] else Category
+        try:
+            instance = model.objects.get(name=options['name'])
+        except model.DoesNotExist:
+            raise CommandError(f"{model.__name__} {options['name']!r} does not exist.")
+
+        def on_progress(done, total):
+            self.stdout.write(f"Deactivated {done} of {total} products")
+
+        cascade = deactivate_sub_category if options['sub_category'] else deactivate_category
+        count = cascade(instance, chunk_size=options['chunk_size'], on_progress=on_progress)
+        self.stdout.write(self.style.SUCCESS(f"{instance.name} deactivated with {count} products."))
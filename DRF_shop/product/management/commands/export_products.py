@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from product.services.export_services import (
+    EXPORT_FORMATS, get_export_queryset, iter_export_rows, render_export
+)
+
+
+class Command(BaseCommand):
+    help = "Stream the catalog as JSONL or CSV, optionally filtered by category or active status."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='jsonl')
+        parser.add_argument('--output', help='File path, stdout by default.')
+        parser.add_argument('--category', type=int, help='Category id.')
+        parser.add_argument('--sub-category', type=int, help='Sub category id.')
+        status = parser.add_mutually_exclusive_group()
+        status.add_argument('--active', dest='is_active', action='store_true', default=None)
+        status.add_argument('--inactive', dest='is_active', action='store_false')
+
+    def handle(self, *args, **options):
+        queryset = get_export_queryset(
+            category_id=options['category'],
+            sub_category_id=options['sub_category'],
+            is_active=options['is_active'],
+        )
+        chunks = render_export(iter_export_rows(queryset), options['format'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from product.services.stock_shard_services import fold_stock_shards
+
+
+class Command(BaseCommand):
+    help = "Write the total of the stock counters into Product.quantity of sharded products."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Keep folding every N seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            count = fold_stock_shards()
+            self.stdout.write(f"Folded stock of {count} products")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from product.services.import_services import (
+    IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_products, iter_rows
+)
+
+
+class Command(BaseCommand):
+    help = "Stream products from a CSV or JSONL file into the catalog in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--no-copy', action='store_true', help='Insert with bulk_create instead of COPY.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(f"Unknown import format {file_format!r}, use --format.")
+
+        def on_batch(report):
+            self.stdout.write(f"Processed {report.processed} rows, created {report.created}, failed {report.failed}")
+
+        with open(path, 'rb') as stream:
+            report = import_products(
+                iter_rows(stream, file_format),
+                batch_size=options['batch_size'],
+                use_copy=False if options['no_copy'] else None,
+                on_batch=on_batch
+            ).as_dict()
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} of {report['processed']} rows "
+            f"in {report['seconds']}s ({report['rows_per_second']} rows/s)."
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from product.models import Product
+from product.services.stock_shard_services import (
+    DEFAULT_STOCK_SHARDS, shard_product_stock, unshard_product_stock
+)
+
+
+class Command(BaseCommand):
+    help = "Split the stock of hot products into counters, or fold it back with --off."
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='+', type=int)
+        parser.add_argument('--shards', type=int, default=DEFAULT_STOCK_SHARDS)
+        parser.add_argument('--off', action='store_true', help='Fold the counters back and stop sharding.')
+
+    def handle(self, *args, **options):
+        if options['shards'] < 1:
+            raise CommandError('--shards must be positive.')
+
+        for product_id in options['product_ids']:
+            try:
+                if options['off']:
+                    product = unshard_product_stock(product_id)
+                    self.stdout.write(f"{product.name}: stock {product.quantity} is not sharded")
+                else:
+                    product = shard_product_stock(product_id, options['shards'])
+                    self.stdout.write(f"{product.name}: stock {product.quantity} in {options['shards']} shards")
+            except Product.DoesNotExist:
+                raise CommandError(f"Product {product_id} does not exist.")
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:33
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Weights must stay in sync with product.services.search_services.PRODUCT_SEARCH_VECTOR
+CREATE_SEARCH_VECTOR_TRIGGER = """
+CREATE FUNCTION product_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.brand, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, COALESCE(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER product_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, brand, description ON product
+    FOR EACH ROW EXECUTE FUNCTION product_search_vector_trigger();
+"""
+
+DROP_SEARCH_VECTOR_TRIGGER = """
+DROP TRIGGER IF EXISTS product_search_vector_update ON product;
+DROP FUNCTION IF EXISTS product_search_vector_trigger();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+        ),
+        migrations.RunSQL(CREATE_SEARCH_VECTOR_TRIGGER, DROP_SEARCH_VECTOR_TRIGGER),
+    ]
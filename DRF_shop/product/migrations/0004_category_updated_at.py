@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='subcategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
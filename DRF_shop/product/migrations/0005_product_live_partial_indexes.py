@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:44
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, product writes are not blocked while they build
+    atomic = False
+
+    dependencies = [
+        ('product', '0004_category_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['created_at', 'id'], name='product_live_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['price', 'id'], name='product_live_price_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['category', 'price'], name='product_live_cat_price_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['brand', 'price'], name='product_live_brand_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True), ('quantity__gt', 0)), fields=['category', 'price'], name='product_in_stock_cat_idx'),
+        ),
+    ]
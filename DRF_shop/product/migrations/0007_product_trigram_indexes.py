@@ -0,0 +1,43 @@
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ('product_name_trgm_idx', 'name'),
+    ('product_brand_trgm_idx', 'brand'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Trigram indexes for product suggestions, skipped where pg_trgm is not available."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON product USING gin ({column} gin_trgm_ops) '
+            f'WHERE is_active AND deleted_at IS NULL'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0005_product_live_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.1 on 2026-10-18 19:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0007_product_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='is_sharded_stock',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ProductStockShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_shards', to='product.product')),
+            ],
+            options={
+                'db_table': 'product_stock_shard',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productstockshard',
+            constraint=models.UniqueConstraint(fields=('product', 'shard'), name='product_stock_shard_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstockshard',
+            constraint=models.CheckConstraint(check=models.Q(('quantity__gte', 0)), name='product_stock_shard_quantity'),
+        ),
+    ]
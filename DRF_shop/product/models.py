@@ -1,10 +1,15 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from product.services.managers import LIVE_PRODUCT_CONDITION, LiveProductManager, ProductManager
+
 
 class Category(models.Model):
     name = models.CharField(unique=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"category{self.name}, is_active={self.is_active}, id={self.id}"
@@ -22,6 +27,7 @@ class SubCategory(models.Model):
     name = models.CharField(unique=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"sub_category={self.name}, parent_category={self.category.name}, is_active={self.is_active}"
@@ -41,17 +47,71 @@ class Product(models.Model):
     description = models.TextField(max_length=1000)
     price = models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Price in UAH', default=0)
     quantity = models.IntegerField(default=1)
+    # Stock is held by ProductStockShard rows, `quantity` is their folded total
+    is_sharded_stock = models.BooleanField(default=False)
 
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # Maintained by the `product_search_vector_update` database trigger
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductManager()
+    live = LiveProductManager()
+
     def __str__(self):
         return self.name
 
     class Meta:
         ordering = ('-created_at', )
         db_table = "product"
+        indexes = (
+            GinIndex(fields=('search_vector',), name='product_search_vector_gin'),
+            # Keyset pagination orderings, `id` is the tiebreaker
+            models.Index(fields=('created_at', 'id'), name='product_created_at_id_idx'),
+            models.Index(fields=('price', 'id'), name='product_price_id_idx'),
+            # Partial indexes over live products only, for the public list and ProductFilter
+            models.Index(
+                fields=('created_at', 'id'), condition=LIVE_PRODUCT_CONDITION, name='product_live_created_idx'
+            ),
+            models.Index(
+                fields=('price', 'id'), condition=LIVE_PRODUCT_CONDITION, name='product_live_price_idx'
+            ),
+            models.Index(
+                fields=('category', 'price'), condition=LIVE_PRODUCT_CONDITION, name='product_live_cat_price_idx'
+            ),
+            models.Index(
+                fields=('brand', 'price'), condition=LIVE_PRODUCT_CONDITION, name='product_live_brand_idx'
+            ),
+            models.Index(
+                fields=('category', 'price'), condition=LIVE_PRODUCT_CONDITION & models.Q(quantity__gt=0),
+                name='product_in_stock_cat_idx'
+            ),
+        )
+
 
 
+
+class ProductStockShard(models.Model):
+    """
+    One of the counters that split the stock of a hot product,
+    so concurrent checkouts lock different rows.
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE,
+        related_name="stock_shards"
+    )
+    shard = models.PositiveSmallIntegerField()
+    quantity = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"product={self.product_id}, shard={self.shard}, quantity={self.quantity}"
+
+    class Meta:
+        db_table = "product_stock_shard"
+        constraints = (
+            models.UniqueConstraint(fields=('product', 'shard'), name='product_stock_shard_unique'),
+            models.CheckConstraint(check=models.Q(quantity__gte=0), name='product_stock_shard_quantity'),
+        )
@@ -0,0 +1,185 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_relation_rows(relation: str) -> int | None:
+    """
+    Row count of a table or index from planner statistics.
+    Returns None when the estimate is not available (not analyzed or not PostgreSQL).
+    """
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [relation])
+        row = cursor.fetchone()
+
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def estimate_row_count(model) -> int | None:
+    """Row count of the model table from planner statistics."""
+    return estimate_relation_rows(model._meta.db_table)
+
+
+def estimate_queryset_count(queryset) -> int | None:
+    """
+    Row count of an unfiltered queryset, or of a queryset filtered exactly
+    by the condition of a partial index, from planner statistics.
+    """
+    where = queryset.query.where
+    if not where:
+        return estimate_row_count(queryset.model)
+
+    manager = queryset.model._base_manager
+    for index in queryset.model._meta.indexes:
+        if index.condition is not None and where == manager.filter(index.condition).query.where:
+            return estimate_relation_rows(index.name)
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the total from planner statistics for unfiltered
+    querysets and querysets matching a partial index.
+    """
+    is_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_queryset_count(self.object_list)
+        if estimate is not None:
+            self.is_estimated = True
+            return estimate
+        return super().count
+
+
+class EstimatedCountPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination with an optional `?estimate_count=true`,
+    which skips `SELECT COUNT(*)` on unfiltered lists.
+    """
+    estimate_count_query_param = 'estimate_count'
+
+    def estimates_count(self, request) -> bool:
+        return request.query_params.get(self.estimate_count_query_param) in ('1', 'true', 'True')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.estimates_count(request):
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if getattr(self.page.paginator, 'is_estimated', False):
+            response.data['count_is_estimated'] = True
+        return response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over `ordering_fields` with `id` as tiebreaker.
+    Every page is a single indexed range scan, no COUNT(*) and no OFFSET.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering_param = api_settings.ORDERING_PARAM
+    ordering_fields = ('created_at', 'price')
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+    unsupported_ordering_message = 'Cursor pagination only orders by {fields}, pass one of them as `{param}`.'
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_param, self.default_ordering)
+        if ordering.lstrip('-') not in self.ordering_fields:
+            return self.default_ordering
+        return ordering
+
+    def decode_cursor(self, request, field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return field.to_python(position['v']), int(position['id'])
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, value, pk) -> str:
+        position = json.dumps({'v': value.isoformat() if hasattr(value, 'isoformat') else str(value), 'id': pk})
+        return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def check_queryset_ordering(self, queryset) -> None:
+        """
+        Reject a queryset already ordered by another field, e.g. the search rank of `?q=`,
+        its order would be silently replaced by the keyset ordering.
+        """
+        allowed = {'id', 'pk', *self.ordering_fields}
+        for field in queryset.query.order_by:
+            if not isinstance(field, str) or field.lstrip('-') not in allowed:
+                raise ValidationError({self.ordering_param: self.unsupported_ordering_message.format(
+                    fields=', '.join(self.ordering_fields), param=self.ordering_param
+                )})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.check_queryset_ordering(queryset)
+        ordering = self.get_ordering(request)
+        field_name = ordering.lstrip('-')
+        descending = ordering.startswith('-')
+        self.field_name = field_name
+
+        queryset = queryset.order_by(ordering, '-id' if descending else 'id')
+
+        cursor = self.decode_cursor(request, queryset.model._meta.get_field(field_name))
+        if cursor is not None:
+            value, pk = cursor
+            # The inclusive bound is what the index scan starts from,
+            # the OR only drops the ties already served.
+            if descending:
+                queryset = queryset.filter(
+                    Q(**{f'{field_name}__lte': value}),
+                    Q(**{f'{field_name}__lt': value}) | Q(id__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field_name}__gte': value}),
+                    Q(**{f'{field_name}__gt': value}) | Q(id__gt=pk)
+                )
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        if isinstance(last, dict):
+            cursor = self.encode_cursor(last[self.field_name], last['id'])
+        else:
+            cursor = self.encode_cursor(getattr(last, self.field_name), last.id)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
@@ -1,8 +1,13 @@
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 
 from product.models import Product, Category, SubCategory
+from product.services.cascade_services import deactivate_category, deactivate_sub_category
+from product.services.category_services import invalidate_category_tree
+from product.services.product_cache import invalidate_products
+from product.services.stock_shard_services import set_sharded_stock
 
 
 class CreateProductSerializer(ModelSerializer):
@@ -19,6 +24,17 @@ class CreateProductSerializer(ModelSerializer):
         return product
 
 
+class ImportProductRowSerializer(serializers.Serializer):
+    """One row of a catalog import, the sub category is given by name."""
+    sub_category = serializers.CharField()
+    name = serializers.CharField(max_length=155)
+    brand = serializers.CharField(max_length=155)
+    description = serializers.CharField(max_length=1000)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, default=0)
+    quantity = serializers.IntegerField(default=1)
+    is_active = serializers.BooleanField(default=True)
+
+
 class GetProductSerializer(ModelSerializer):
     class Meta:
         model = Product
@@ -41,11 +57,28 @@ class UpdateProductSerializer(ModelSerializer):
         instance.price = validated_data.get('price', instance.price)
         instance.quantity = validated_data.get('quantity', instance.quantity)
         instance.description = validated_data.get('description', instance.description)
-        instance.save()
+        if instance.is_sharded_stock and 'quantity' in validated_data:
+            # The counters hold the stock of a sharded product, they are re-split with the write
+            with transaction.atomic():
+                instance.save()
+                set_sharded_stock({instance.id: instance.quantity})
+        else:
+            instance.save()
+        transaction.on_commit(lambda: invalidate_products([instance.id]))
 
         return instance
 
 
+class BatchUpdateProductItemSerializer(serializers.Serializer):
+    """One patch of a batch product update, every field but `id` is optional."""
+    id = serializers.IntegerField()
+    name = serializers.CharField(max_length=155, required=False)
+    brand = serializers.CharField(max_length=155, required=False)
+    description = serializers.CharField(max_length=1000, required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+
+
 class IsActiveStatusProductSerializer(ModelSerializer):
 
     class Meta:
@@ -78,6 +111,7 @@ class IsActiveStatusProductSerializer(ModelSerializer):
             instance.deleted_at = timezone.now()
 
         instance.save()
+        transaction.on_commit(lambda: invalidate_products([instance.id]))
         return instance
 
 
@@ -89,6 +123,7 @@ class CategorySerializer(ModelSerializer):
 
     def create(self, validated_data):
         category = Category.objects.create(name=validated_data.get('name'))
+        transaction.on_commit(invalidate_category_tree)
         return category
 
 
@@ -110,13 +145,15 @@ class UpdateStatusCategorySerializer(ModelSerializer):
 
     def update(self, instance, validated_data):
         is_active = validated_data.get('is_active')
-        instance.is_active = is_active
 
         if not is_active:
-            # disable all active sub categories
-            instance.sub_category.filter(is_active=True).update(is_active=is_active)
+            # disable the category with all sub categories and their products
+            deactivate_category(instance)
+            return instance
 
+        instance.is_active = is_active
         instance.save()
+        transaction.on_commit(invalidate_category_tree)
         return instance
 
 
@@ -127,6 +164,7 @@ class CreateSubCategorySerializer(ModelSerializer):
 
     def create(self, validated_data):
         sub_category = SubCategory.objects.create(**validated_data)
+        transaction.on_commit(invalidate_category_tree)
         return sub_category
 
 
@@ -158,12 +196,15 @@ class UpdateStatusSubCategorySerializer(ModelSerializer):
 
     def update(self, instance, validated_data):
         is_active = validated_data.get('is_active')
-        instance.is_active = is_active
 
         if not is_active:
-            instance.products.filter(is_active=True).update(is_active=is_active)
+            # disable the sub category with all its products
+            deactivate_sub_category(instance)
+            return instance
 
+        instance.is_active = is_active
         instance.save()
+        transaction.on_commit(invalidate_category_tree)
         return instance
 
 
@@ -184,7 +225,8 @@ class ActivateSubCategoriesSerializer(ModelSerializer):
     def update(self, instance, validated_data):
         # Activate inactive subcategories
         SubCategory.objects.filter(category=instance.id,
-                                   is_active=False).update(is_active=True)
+                                   is_active=False).update(is_active=True, updated_at=timezone.now())
+        transaction.on_commit(invalidate_category_tree)
         # Fetch and serialize activated subcategories
         sub_categories = SubCategory.objects.filter(category=instance.id, is_active=True)
         sub_categories_list = [{'name': sub_cat.name, 'is_active': sub_cat.is_active}
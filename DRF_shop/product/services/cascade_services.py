@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.utils import timezone
+
+from product.models import Category, SubCategory, Product
+from product.services.category_services import invalidate_category_tree
+from product.services.product_cache import invalidate_products
+
+CASCADE_CHUNK_SIZE = 1000
+
+
+def deactivate_products(queryset, chunk_size: int = CASCADE_CHUNK_SIZE, on_progress=None) -> int:
+    """
+    Deactivate the active products of `queryset` in id-ordered chunks.
+    Every chunk is its own short transaction, so row locks are held only for
+    `chunk_size` rows at a time. `on_progress(done, total)` is called after each chunk.
+    """
+    queryset = queryset.filter(is_active=True)
+    total = queryset.count() if on_progress is not None else None
+
+    done = 0
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            break
+
+        with transaction.atomic():
+            now = timezone.now()
+            # Same as IsActiveStatusProductSerializer: deactivation stamps deleted_at
+            Product.objects.filter(id__in=ids, is_active=True).update(
+                is_active=False, deleted_at=now, updated_at=now
+            )
+        transaction.on_commit(lambda ids=ids: invalidate_products(ids))
+
+        done += len(ids)
+        last_id = ids[-1]
+        if on_progress is not None:
+            on_progress(done, total)
+
+    return done
+
+
+def deactivate_sub_category(sub_category: SubCategory, chunk_size: int = CASCADE_CHUNK_SIZE,
+                            on_progress=None) -> int:
+    """Deactivate a sub category and its products, returns the number of deactivated products."""
+    SubCategory.objects.filter(id=sub_category.id).update(is_active=False, updated_at=timezone.now())
+    sub_category.is_active = False
+    transaction.on_commit(invalidate_category_tree)
+
+    return deactivate_products(
+        Product.objects.filter(category_id=sub_category.id), chunk_size, on_progress
+    )
+
+
+def deactivate_category(category: Category, chunk_size: int = CASCADE_CHUNK_SIZE,
+                        on_progress=None) -> int:
+    """
+    Deactivate a category, all its sub categories and their products,
+    returns the number of deactivated products.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        Category.objects.filter(id=category.id).update(is_active=False, updated_at=now)
+        SubCategory.objects.filter(category_id=category.id, is_active=True).update(is_active=False, updated_at=now)
+    category.is_active = False
+    transaction.on_commit(invalidate_category_tree)
+
+    return deactivate_products(
+        Product.objects.filter(category__category_id=category.id), chunk_size, on_progress
+    )
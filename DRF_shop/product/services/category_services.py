@@ -1,6 +1,20 @@
+import threading
+import time
+
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 from rest_framework.generics import UpdateAPIView
 
+from product.models import Category, SubCategory
+
+# Upper bound of staleness for worker processes that did not see the write
+CATEGORY_TREE_TTL = 300
+
+_category_tree = None
+_category_tree_built_at = 0.0
+_category_tree_generation = 0
+_category_tree_lock = threading.Lock()
+
 
 class ActivateOrDeactivateCategoryAPIView(UpdateAPIView):
     authentication_classes = ()
@@ -9,3 +23,51 @@ class ActivateOrDeactivateCategoryAPIView(UpdateAPIView):
     def get_object(self):
         name = self.request.data.get('name')
         return get_object_or_404(self.queryset, name=name)
+
+
+def build_category_tree() -> list:
+    """Active categories with nested active sub categories and active product counts."""
+    sub_categories = SubCategory.objects.filter(
+        is_active=True, category__is_active=True
+    ).annotate(
+        product_count=Count('products', filter=Q(products__is_active=True, products__deleted_at__isnull=True))
+    ).order_by('-created_at').values('id', 'name', 'category_id', 'product_count')
+
+    children = {}
+    for sub_category in sub_categories:
+        category_id = sub_category.pop('category_id')
+        children.setdefault(category_id, []).append(sub_category)
+
+    tree = []
+    for category in Category.objects.filter(is_active=True).values('id', 'name'):
+        category['sub_categories'] = children.get(category['id'], [])
+        category['product_count'] = sum(sub['product_count'] for sub in category['sub_categories'])
+        tree.append(category)
+    return tree
+
+
+def get_category_tree() -> list:
+    """Category tree from the in-process cache, rebuilt after invalidation or TTL."""
+    global _category_tree, _category_tree_built_at
+
+    with _category_tree_lock:
+        if _category_tree is not None and time.monotonic() - _category_tree_built_at < CATEGORY_TREE_TTL:
+            return _category_tree
+        generation = _category_tree_generation
+
+    tree = build_category_tree()
+
+    with _category_tree_lock:
+        # Do not store a tree that was read before a concurrent invalidation
+        if generation == _category_tree_generation:
+            _category_tree = tree
+            _category_tree_built_at = time.monotonic()
+    return tree
+
+
+def invalidate_category_tree() -> None:
+    global _category_tree, _category_tree_generation
+
+    with _category_tree_lock:
+        _category_tree = None
+        _category_tree_generation += 1
@@ -0,0 +1,71 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from product.models import Product
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+EXPORT_FIELDS = (
+    'id', 'name', 'brand', 'description', 'price', 'quantity',
+    'is_active', 'created_at', 'updated_at', 'deleted_at',
+)
+EXPORT_RELATED_FIELDS = {
+    'sub_category_id': F('category_id'),
+    'sub_category_name': F('category__name'),
+    'parent_category_id': F('category__category_id'),
+    'parent_category_name': F('category__category__name'),
+}
+EXPORT_COLUMNS = EXPORT_FIELDS + tuple(EXPORT_RELATED_FIELDS)
+
+
+class _Echo:
+    """File-like object for csv.writer that hands the written line back."""
+
+    def write(self, value):
+        return value
+
+
+def get_export_queryset(category_id=None, sub_category_id=None, is_active=None):
+    """Products in id order with sub category and category names joined in."""
+    queryset = Product.objects.order_by('id')
+    if category_id is not None:
+        queryset = queryset.filter(category__category_id=category_id)
+    if sub_category_id is not None:
+        queryset = queryset.filter(category_id=sub_category_id)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+
+    return queryset.values(*EXPORT_FIELDS, **EXPORT_RELATED_FIELDS)
+
+
+def iter_export_rows(queryset):
+    """Read rows through a server-side cursor, memory use does not grow with the catalog."""
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def render_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def render_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([row[column] for column in EXPORT_COLUMNS])
+
+
+def render_export(rows, export_format: str):
+    if export_format == 'jsonl':
+        return render_jsonl(rows)
+    if export_format == 'csv':
+        return render_csv(rows)
+    raise ValueError(f"Unsupported export format {export_format!r}")
@@ -0,0 +1,66 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Value, When
+
+FACETS_CACHE_TIMEOUT = 60
+# Query parameters that change the page or its order, not the filtered set
+FACETS_IGNORED_PARAMS = frozenset(('page', 'cursor', 'pagination', 'ordering', 'estimate_count'))
+PRICE_BUCKETS = (0, 100, 500, 1000, 5000, 10000)
+
+
+def _price_bucket_labels():
+    labels = [f'{low}-{high}' for low, high in zip(PRICE_BUCKETS, PRICE_BUCKETS[1:])]
+    return labels + [f'{PRICE_BUCKETS[-1]}+']
+
+
+def _price_bucket_expression():
+    whens = [
+        When(price__gte=low, price__lt=high, then=Value(label))
+        for (low, high), label in zip(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:]), _price_bucket_labels())
+    ]
+    return Case(*whens, default=Value(_price_bucket_labels()[-1]), output_field=CharField())
+
+
+def compute_facets(queryset) -> dict:
+    """Counts per brand, sub category and price bucket, one grouped query per facet."""
+    queryset = queryset.order_by()
+
+    brands = queryset.values('brand').annotate(count=Count('id')).order_by('-count', 'brand')
+    sub_categories = queryset.values(
+        sub_category_id=F('category_id'), sub_category_name=F('category__name')
+    ).annotate(count=Count('id')).order_by('-count', 'sub_category_name')
+    price_counts = dict(
+        queryset.annotate(price_bucket=_price_bucket_expression())
+        .values('price_bucket').annotate(count=Count('id')).values_list('price_bucket', 'count')
+    )
+
+    return {
+        'brand': list(brands),
+        'sub_category': list(sub_categories),
+        'price': [
+            {'range': label, 'count': price_counts[label]}
+            for label in _price_bucket_labels() if label in price_counts
+        ],
+    }
+
+
+def get_facets_cache_key(query_params) -> str:
+    """The same filter gives the same key regardless of parameter order or paging."""
+    params = sorted(
+        (key, value)
+        for key in query_params if key not in FACETS_IGNORED_PARAMS
+        for value in query_params.getlist(key)
+    )
+    return 'product-facets:' + hashlib.md5(urlencode(params).encode(), usedforsecurity=False).hexdigest()
+
+
+def get_facets(queryset, query_params) -> dict:
+    """Facet counts of the filtered queryset, shared between requests for a short time."""
+    key = get_facets_cache_key(query_params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, timeout=FACETS_CACHE_TIMEOUT)
+    return facets
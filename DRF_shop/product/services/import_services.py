@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from product.models import Product, SubCategory
+from product.serializers import ImportProductRowSerializer
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_BATCH_SIZE = 1000
+
+COPY_COLUMNS = (
+    'category_id', 'name', 'brand', 'description', 'price',
+    'quantity', 'is_sharded_stock', 'is_active', 'created_at', 'updated_at'
+)
+
+
+class ImportReport:
+    """Counters of a running import, keeps at most `max_errors` row errors."""
+    max_errors = 1000
+
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.started_at = time.monotonic()
+
+    def add_error(self, row_number: int, errors) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self) -> dict:
+        seconds = time.monotonic() - self.started_at
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(self.processed / seconds) if seconds else self.processed,
+        }
+
+
+def iter_rows(stream, file_format: str):
+    """Lazily parse a binary stream of CSV or JSON lines into row dicts."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    if file_format == 'csv':
+        for row in csv.DictReader(text):
+            # Empty cells fall back to the serializer defaults
+            yield {key: value for key, value in row.items() if key and value not in ('', None)}
+
+    elif file_format == 'jsonl':
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Reported by the row validation as not being a dictionary
+                yield line
+
+    else:
+        raise ValueError(f"Unsupported import format {file_format!r}")
+
+
+def iter_batches(rows, batch_size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_products(products) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for product in products:
+        writer.writerow([getattr(product, column) for column in COPY_COLUMNS])
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Product._meta.db_table} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+
+def import_products(rows, batch_size: int = IMPORT_BATCH_SIZE, use_copy: bool = None,
+                    on_batch=None) -> ImportReport:
+    """
+    Validate and insert product rows batch by batch.
+    Sub categories are resolved with one query per batch, rows are written with
+    PostgreSQL COPY when available and `bulk_create` otherwise.
+    """
+    if use_copy is None:
+        use_copy = connection.vendor == 'postgresql'
+
+    report = ImportReport()
+    validator = ImportProductRowSerializer()
+    sub_category_ids = {}
+
+    for batch in iter_batches(rows, batch_size):
+        first_row_number = report.processed + 1
+        report.processed += len(batch)
+
+        valid_rows = []
+        for row_number, row in enumerate(batch, start=first_row_number):
+            try:
+                valid_rows.append((row_number, validator.run_validation(row)))
+            except ValidationError as exc:
+                report.add_error(row_number, exc.detail)
+
+        missing = {data['sub_category'] for _, data in valid_rows} - sub_category_ids.keys()
+        if missing:
+            sub_category_ids.update(dict.fromkeys(missing))
+            sub_category_ids.update(
+                SubCategory.objects.filter(name__in=missing).values_list('name', 'id')
+            )
+
+        now = timezone.now()
+        products = []
+        for row_number, data in valid_rows:
+            category_id = sub_category_ids.get(data.pop('sub_category'))
+            if category_id is None:
+                report.add_error(row_number, {'sub_category': ['Sub category does not exist.']})
+                continue
+            products.append(Product(category_id=category_id, created_at=now, updated_at=now, **data))
+
+        if products:
+            with transaction.atomic():
+                if use_copy:
+                    _copy_products(products)
+                else:
+                    Product.objects.bulk_create(products)
+            report.created += len(products)
+
+        if on_batch is not None:
+            on_batch(report)
+
+    return report
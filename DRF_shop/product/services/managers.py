@@ -0,0 +1,22 @@
+from django.db import models
+
+# Products shown on the public catalog, deactivated products are soft deleted
+LIVE_PRODUCT_CONDITION = models.Q(is_active=True, deleted_at__isnull=True)
+
+
+class ProductQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(LIVE_PRODUCT_CONDITION)
+
+
+class ProductManager(models.Manager.from_queryset(ProductQuerySet)):
+    """All products, including deactivated ones. Used by staff views."""
+
+
+class LiveProductManager(ProductManager):
+    """
+    Active, not deleted products. Used by the public endpoints,
+    its filter matches the partial indexes of Product.
+    """
+    def get_queryset(self):
+        return super().get_queryset().live()
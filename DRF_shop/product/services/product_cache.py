@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRODUCT_CACHE_TIMEOUT = 60 * 60
+# A process-local cache only sees the invalidations of its own process,
+# other worker processes serve stale payloads until they expire
+LOCAL_PRODUCT_CACHE_TIMEOUT = 30
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# How long a rebuild may hold the lock, and how long other requests wait for it
+PRODUCT_CACHE_LOCK_TIMEOUT = 10
+PRODUCT_CACHE_LOCK_WAIT = 2
+PRODUCT_CACHE_POLL_INTERVAL = 0.02
+
+
+def get_product_cache_timeout() -> int:
+    if settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return LOCAL_PRODUCT_CACHE_TIMEOUT
+    return PRODUCT_CACHE_TIMEOUT
+
+
+def _version_key(product_id) -> str:
+    return f'product:{product_id}:version'
+
+
+def _payload_key(product_id, version) -> str:
+    return f'product:{product_id}:v{version}'
+
+
+def get_product_version(product_id) -> int:
+    """
+    Current cache version of a product.
+    A missing version is seeded with a fresh value, so payloads cached under
+    an evicted or invalidated version are never read again.
+    """
+    key = _version_key(product_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def peek_cached_product(product_id):
+    """Cached payload of a product or None, never builds it."""
+    return cache.get(_payload_key(product_id, get_product_version(product_id)))
+
+
+def get_cached_product(product_id, build):
+    """
+    Read-through cache of serialized product payloads.
+    On a miss only one caller runs `build`, concurrent callers wait for its result.
+    """
+    key = _payload_key(product_id, get_product_version(product_id))
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + PRODUCT_CACHE_LOCK_WAIT
+    while not cache.add(lock_key, True, timeout=PRODUCT_CACHE_LOCK_TIMEOUT):
+        time.sleep(PRODUCT_CACHE_POLL_INTERVAL)
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+        if time.monotonic() >= deadline:
+            # The rebuilding request is too slow, do not wait for it any longer
+            return build()
+
+    try:
+        payload = cache.get(key)
+        if payload is None:
+            payload = build()
+            cache.set(key, payload, timeout=get_product_cache_timeout())
+    finally:
+        cache.delete(lock_key)
+    return payload
+
+
+def invalidate_products(product_ids) -> None:
+    """Drop cached payloads of the given products by retiring their versions."""
+    cache.delete_many([_version_key(product_id) for product_id in product_ids])
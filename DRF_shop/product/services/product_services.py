@@ -1,18 +1,87 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 from product.models import Product
+from product.serializers import BatchUpdateProductItemSerializer
+from product.services.product_cache import invalidate_products
+from product.services.stock_shard_services import set_sharded_stock
 
+# Every product of a batch stays locked until the batch is written
+BATCH_UPDATE_MAX_PRODUCTS = 1000
 
-def get_product_by_id(product_id):
+
+def parse_product_id(product_id) -> int:
     try:
         product_id = int(product_id)
-        if product_id:
-            return get_object_or_404(Product, id=product_id)
-        raise ValidationError('Product id must be given')
-
     except (ValueError, TypeError):
         raise ValidationError({
             'error': {'id': 'You should give a number!'}
         })
 
+    if not product_id:
+        raise ValidationError('Product id must be given')
+    return product_id
+
+
+def get_product_by_id(product_id, queryset=Product.objects):
+    return get_object_or_404(queryset, id=parse_product_id(product_id))
+
+
+def batch_update_products(patches: list) -> list:
+    """
+    Validate and apply a list of product patches.
+    Products are read with one locked query and written with one `bulk_update`,
+    invalid patches are reported per item and skipped.
+    """
+    validator = BatchUpdateProductItemSerializer()
+    results = []
+    valid = {}
+    for patch in patches:
+        item_id = patch.get('id') if isinstance(patch, dict) else None
+        try:
+            data = validator.run_validation(patch)
+        except ValidationError as exc:
+            results.append({'id': item_id, 'status': 'error', 'errors': exc.detail})
+            continue
+
+        if data['id'] in valid:
+            results.append({'id': data['id'], 'status': 'error', 'errors': {'id': ['Duplicated product id.']}})
+            continue
+        valid[data['id']] = data
+        results.append({'id': data['id'], 'status': 'updated'})
+
+    with transaction.atomic():
+        # Locked in id order like `reserve_stock`, `in_bulk()` would drop the ORDER BY
+        products = {
+            product.id: product
+            for product in Product.objects.select_for_update().filter(id__in=list(valid)).order_by('id')
+        }
+
+        now = timezone.now()
+        fields = {'updated_at'}
+        for result in results:
+            if result['status'] != 'updated':
+                continue
+            product = products.get(result['id'])
+            if product is None:
+                result.update(status='error', errors={'id': ['Product does not exist.']})
+                continue
+
+            for field, value in valid[result['id']].items():
+                setattr(product, field, value)
+                fields.add(field)
+            product.updated_at = now
+
+        updated = [products[result['id']] for result in results if result['status'] == 'updated']
+        if updated:
+            Product.objects.bulk_update(updated, sorted(fields - {'id'}))
+            set_sharded_stock({
+                product.id: product.quantity
+                for product in updated if product.is_sharded_stock and 'quantity' in valid[product.id]
+            })
+            product_ids = [product.id for product in updated]
+            transaction.on_commit(lambda: invalidate_products(product_ids))
+
+    return results
@@ -0,0 +1,25 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, QuerySet
+
+SEARCH_CONFIG = 'english'
+
+# Same expression as the `product_search_vector_trigger` database function,
+# name > brand > description.
+PRODUCT_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('brand', weight='B', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+)
+
+
+def search_products(queryset: QuerySet, term: str) -> QuerySet:
+    """Filter products matching `term` and annotate them with a `rank`."""
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).filter(search_vector=query)
+
+
+def refresh_search_vector(queryset: QuerySet) -> int:
+    """Recompute the search vector of the given products."""
+    return queryset.update(search_vector=PRODUCT_SEARCH_VECTOR)
@@ -0,0 +1,132 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from product.models import Product, ProductStockShard
+from product.services.product_cache import invalidate_products
+
+DEFAULT_STOCK_SHARDS = 8
+
+
+def split_stock(quantity: int, shards: int) -> list:
+    """`quantity` spread over `shards` counters as evenly as possible."""
+    base, remainder = divmod(max(quantity, 0), shards)
+    return [base + (shard < remainder) for shard in range(shards)]
+
+
+@transaction.atomic
+def shard_product_stock(product_id: int, shards: int = DEFAULT_STOCK_SHARDS) -> Product:
+    """
+    Move the stock of a product into `shards` counters, or re-split it
+    across a new number of counters if the product is already sharded.
+    """
+    product = Product.objects.select_for_update().get(id=product_id)
+    stock_shards = ProductStockShard.objects.select_for_update().filter(product=product)
+    if product.is_sharded_stock:
+        product.quantity = stock_shards.aggregate(total=Coalesce(Sum('quantity'), 0))['total']
+    stock_shards.delete()
+
+    ProductStockShard.objects.bulk_create([
+        ProductStockShard(product=product, shard=shard, quantity=quantity)
+        for shard, quantity in enumerate(split_stock(product.quantity, shards))
+    ])
+    product.is_sharded_stock = True
+    product.save(update_fields=('quantity', 'is_sharded_stock', 'updated_at'))
+    transaction.on_commit(lambda: invalidate_products([product.id]))
+    return product
+
+
+@transaction.atomic
+def unshard_product_stock(product_id: int) -> Product:
+    """Fold the counters of a product back into `Product.quantity` and drop them."""
+    product = Product.objects.select_for_update().get(id=product_id)
+    stock_shards = ProductStockShard.objects.select_for_update().filter(product=product)
+    product.quantity = stock_shards.aggregate(total=Coalesce(Sum('quantity'), 0))['total']
+    stock_shards.delete()
+
+    product.is_sharded_stock = False
+    product.save(update_fields=('quantity', 'is_sharded_stock', 'updated_at'))
+    transaction.on_commit(lambda: invalidate_products([product.id]))
+    return product
+
+
+def set_sharded_stock(quantities: dict) -> None:
+    """
+    Re-split `{product_id: quantity}` over the current counters of sharded products,
+    so a stock write through the product endpoints is not undone by the next fold.
+    Runs in the transaction that writes `Product.quantity`.
+    """
+    if not quantities:
+        return
+    stock_shards = ProductStockShard.objects.filter(product_id__in=list(quantities))
+    shards = Counter(stock_shards.select_for_update().order_by('product_id', 'shard').values_list(
+        'product_id', flat=True
+    ))
+    stock_shards.delete()
+
+    ProductStockShard.objects.bulk_create([
+        ProductStockShard(product_id=product_id, shard=shard, quantity=quantity)
+        for product_id, count in shards.items()
+        for shard, quantity in enumerate(split_stock(quantities[product_id], count))
+    ])
+
+
+def take_sharded_stock(product_id: int, quantity: int) -> bool:
+    """
+    Take `quantity` from the counters of a sharded product, returns False when short.
+    A random counter with enough stock is locked with SKIP LOCKED, so concurrent
+    checkouts spread over the counters instead of queueing on one row lock.
+    Only when no free counter can serve the line, all counters are locked in
+    shard order and the line is taken across them.
+    """
+    stock_shards = ProductStockShard.objects.filter(product_id=product_id)
+
+    shard_id = stock_shards.filter(quantity__gte=quantity).select_for_update(
+        skip_locked=True
+    ).order_by('?').values_list('id', flat=True).first()
+    if shard_id is not None:
+        ProductStockShard.objects.filter(id=shard_id).update(quantity=F('quantity') - quantity)
+        return True
+
+    locked = list(stock_shards.select_for_update().order_by('shard').values_list('id', 'quantity'))
+    if sum(available for _, available in locked) < quantity:
+        return False
+
+    remaining = quantity
+    for shard_id, available in locked:
+        taken = min(available, remaining)
+        if taken:
+            ProductStockShard.objects.filter(id=shard_id).update(quantity=F('quantity') - taken)
+            remaining -= taken
+        if not remaining:
+            break
+    return True
+
+
+def fold_stock_shards(product_ids=None) -> int:
+    """
+    Write the total of the counters into `Product.quantity` of sharded products,
+    returns the number of updated products.
+    """
+    products = Product.objects.filter(is_sharded_stock=True)
+    if product_ids is not None:
+        products = products.filter(id__in=product_ids)
+
+    total = ProductStockShard.objects.filter(product=OuterRef('pk')).order_by().values('product').annotate(
+        total=Sum('quantity')
+    ).values('total')
+    # Only products whose stock changed are written, an unchanged row is not locked
+    ids = list(products.annotate(folded=Coalesce(Subquery(total), 0)).exclude(
+        quantity=F('folded')
+    ).values_list('id', flat=True))
+    if not ids:
+        return 0
+
+    updated = Product.objects.filter(id__in=ids).update(
+        quantity=Coalesce(Subquery(total), 0), updated_at=timezone.now()
+    )
+    transaction.on_commit(lambda: invalidate_products(ids))
+    return updated
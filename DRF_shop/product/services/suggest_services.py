@@ -0,0 +1,130 @@
+import bisect
+import hashlib
+import threading
+import time
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.cache import cache
+from django.db import connection
+
+from product.models import Product
+
+SUGGEST_FIELDS = ('name', 'brand')
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_MAX_LENGTH = 50
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+# Popular prefixes are served from the cache, short enough for new products to show up soon
+SUGGEST_CACHE_TIMEOUT = 30
+# Rebuild interval of the in-process prefix index used without pg_trgm
+PREFIX_INDEX_TTL = 60
+
+_trigram_available = None
+_prefix_index = None
+_prefix_index_built_at = 0.0
+_prefix_index_lock = threading.Lock()
+
+
+def trigram_available() -> bool:
+    """Whether the pg_trgm extension is installed, checked once per process."""
+    global _trigram_available
+
+    if _trigram_available is None:
+        if connection.vendor != 'postgresql':
+            _trigram_available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                _trigram_available = cursor.fetchone() is not None
+    return _trigram_available
+
+
+def normalize_term(term: str) -> str:
+    return ' '.join(term.lower().split())
+
+
+def suggest_with_trigrams(term: str, limit: int) -> list:
+    """
+    Names and brands of live products ranked by trigram word similarity.
+    The `%>` filter is answered by the trigram GIN indexes, one query per field.
+    """
+    suggestions = []
+    for field in SUGGEST_FIELDS:
+        rows = Product.live.filter(
+            **{f'{field}__trigram_word_similar': term}
+        ).annotate(
+            similarity=TrigramWordSimilarity(term, field)
+        ).order_by('-similarity', field).values_list(field, 'similarity').distinct()[:limit]
+        suggestions.extend({'text': text, 'field': field, 'score': round(score, 3)} for text, score in rows)
+
+    suggestions.sort(key=lambda suggestion: (-suggestion['score'], suggestion['text']))
+    return suggestions[:limit]
+
+
+def build_prefix_index() -> tuple:
+    """
+    Sorted (key, text, field) entries over every word start of live product
+    names and brands, so prefixes of any word can be found by bisection.
+    """
+    entries = set()
+    for field in SUGGEST_FIELDS:
+        for text in Product.live.order_by().values_list(field, flat=True).distinct():
+            words = normalize_term(text).split(' ')
+            for position in range(len(words)):
+                entries.add((' '.join(words[position:]), text, field))
+
+    entries = sorted(entries)
+    return [entry[0] for entry in entries], entries
+
+
+def get_prefix_index() -> tuple:
+    global _prefix_index, _prefix_index_built_at
+
+    with _prefix_index_lock:
+        if _prefix_index is None or time.monotonic() - _prefix_index_built_at >= PREFIX_INDEX_TTL:
+            _prefix_index = build_prefix_index()
+            _prefix_index_built_at = time.monotonic()
+        return _prefix_index
+
+
+def invalidate_prefix_index() -> None:
+    global _prefix_index
+
+    with _prefix_index_lock:
+        _prefix_index = None
+
+
+def suggest_with_prefix_index(term: str, limit: int) -> list:
+    """Word prefix matches from the in-process index, shorter texts rank higher."""
+    keys, entries = get_prefix_index()
+    start = bisect.bisect_left(keys, term)
+    end = bisect.bisect_left(keys, term + '\uffff', lo=start)
+
+    matches = {(text, field) for _, text, field in entries[start:end]}
+    suggestions = [
+        {'text': text, 'field': field, 'score': round(len(term) / len(normalize_term(text)), 3)}
+        for text, field in matches
+    ]
+    suggestions.sort(key=lambda suggestion: (-suggestion['score'], suggestion['text']))
+    return suggestions[:limit]
+
+
+def get_suggestions(term: str, limit: int = SUGGEST_LIMIT) -> list:
+    """
+    Typeahead suggestions for product names and brands.
+    Uses the trigram indexes when pg_trgm is installed, the in-process prefix index otherwise.
+    Results of a prefix are cached for SUGGEST_CACHE_TIMEOUT seconds.
+    """
+    term = normalize_term(term)[:SUGGEST_MAX_LENGTH]
+    if len(term) < SUGGEST_MIN_LENGTH:
+        return []
+
+    key = f'product-suggest:{limit}:' + hashlib.md5(term.encode(), usedforsecurity=False).hexdigest()
+    suggestions = cache.get(key)
+    if suggestions is None:
+        if trigram_available():
+            suggestions = suggest_with_trigrams(term, limit)
+        else:
+            suggestions = suggest_with_prefix_index(term, limit)
+        cache.set(key, suggestions, timeout=SUGGEST_CACHE_TIMEOUT)
+    return suggestions
@@ -0,0 +1,65 @@
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+
+from product.filters import ProductFilter
+from product.models import Category, SubCategory, Product
+
+SEED_PRODUCTS = 50000
+SEED_SUB_CATEGORIES = 50
+SEED_BRANDS = 2000
+
+
+class TestProductFilterQueryPlans(TestCase):
+    """The planner picks the filter indexes on a large, analyzed product table."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Seed')
+        SubCategory.objects.bulk_create([
+            SubCategory(category=category, name=f'Seed {i}') for i in range(SEED_SUB_CATEGORIES)
+        ])
+        cls.sub_category = SubCategory.objects.order_by('id').first()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO product (category_id, name, brand, description, price, quantity,
+                                     is_sharded_stock, is_active, created_at, updated_at)
+                SELECT sub_category.id + i %% %(sub_categories)s,
+                       'Product ' || i, 'Brand ' || i %% %(brands)s, 'Seeded product',
+                       (i * 7919) %% 10000, i %% 5, false, i %% 10 <> 0,
+                       now() - i * interval '1 minute', now()
+                FROM generate_series(1, %(products)s) AS i,
+                     (SELECT min(id) AS id FROM sub_category) AS sub_category
+                """,
+                {'products': SEED_PRODUCTS, 'sub_categories': SEED_SUB_CATEGORIES, 'brands': SEED_BRANDS}
+            )
+            cursor.execute('ANALYZE product')
+
+    def explain(self, params: str) -> str:
+        queryset = ProductFilter(QueryDict(params), queryset=Product.live.all()).qs
+        return queryset.order_by('price')[:10].explain()
+
+    def test_seeded(self):
+        self.assertEqual(Product.objects.count(), SEED_PRODUCTS)
+
+    def test_live_list_uses_partial_index(self):
+        plan = Product.live.order_by('-created_at')[:10].explain()
+
+        self.assertIn('product_live_created_idx', plan)
+
+    def test_sub_category_and_price_range_use_partial_index(self):
+        plan = self.explain(f'sub_category={self.sub_category.id}&min_price=100&max_price=500')
+
+        self.assertIn('product_live_cat_price_idx', plan)
+
+    def test_brand_list_uses_partial_index(self):
+        plan = self.explain('brand=Brand 1,Brand 2')
+
+        self.assertIn('product_live_brand_idx', plan)
+
+    def test_in_stock_uses_partial_index(self):
+        plan = self.explain(f'in_stock=true&sub_category={self.sub_category.id}')
+
+        self.assertIn('product_in_stock_cat_idx', plan)
@@ -1,10 +1,37 @@
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
 from rest_framework.test import APITestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 
+from core.testing import QueryBudgetMixin
 from customer.tests.test_views import create_staff_user_test_data
 from product.models import Category, SubCategory, Product
+from product.services.category_services import invalidate_category_tree
+from product.services.product_services import BATCH_UPDATE_MAX_PRODUCTS
+from product.serializers import GetProductSerializer
+from product.services import suggest_services
+from product.services.product_cache import (
+    LOCAL_PRODUCT_CACHE_TIMEOUT, PRODUCT_CACHE_TIMEOUT, get_cached_product, get_product_cache_timeout,
+    invalidate_products
+)
+from product.values_serializers import ValuesSerializer
 
 User = get_user_model()
 
@@ -322,3 +349,846 @@ class TestProductViews(APITestCase):
 
         self.assertEqual(response_400.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response_404.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestProductSearch(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.list_url = reverse('list_of_products')
+        cls.update_product_url = reverse('update_product')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.by_name = Product.objects.create(
+            name='Galaxy phone', brand='Samsung', description='Android smartphone',
+            category=cls.sub_category
+        )
+        cls.by_brand = Product.objects.create(
+            name='Watch', brand='Galaxy', description='Smart watch',
+            category=cls.sub_category
+        )
+        cls.by_description = Product.objects.create(
+            name='Case', brand='Spigen', description='Fits galaxy phones',
+            category=cls.sub_category
+        )
+
+    def test_search_orders_by_relevance(self):
+        response = self.client.get(self.list_url, {'q': 'galaxy'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [product['id'] for product in response.data['results']]
+        self.assertEqual(ids, [self.by_name.id, self.by_brand.id, self.by_description.id])
+
+    def test_search_sees_updated_product(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.put(
+            self.update_product_url,
+            data={'id': self.by_description.id, 'name': 'Pixel case', 'brand': 'Spigen', 'description': 'Cover'}
+        )
+
+        galaxy = self.client.get(self.list_url, {'q': 'galaxy'})
+        pixel = self.client.get(self.list_url, {'q': 'pixel'})
+
+        self.assertNotIn(self.by_description.id, [product['id'] for product in galaxy.data['results']])
+        self.assertEqual([product['id'] for product in pixel.data['results']], [self.by_description.id])
+
+    def test_backfill_search_vector(self):
+        Product.objects.update(search_vector=None)
+
+        call_command('backfill_search_vector', chunk_size=2, stdout=StringIO())
+
+        self.assertFalse(Product.objects.filter(search_vector__isnull=True).exists())
+        response = self.client.get(self.list_url, {'q': 'watch'})
+        self.assertEqual([product['id'] for product in response.data['results']], [self.by_brand.id])
+
+
+class TestProductListPagination(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.list_url = reverse('list_of_products')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        # Few distinct prices, so pages have to break ties by id
+        Product.objects.bulk_create([
+            Product(name=f'Product {i}', brand='Brand', description='test',
+                    price=100 * (i % 3), category=cls.sub_category)
+            for i in range(25)
+        ])
+
+    def walk_cursor_pages(self, params):
+        ids = []
+        response = self.client.get(self.list_url, {'pagination': 'cursor', **params})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(product['id'] for product in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_pagination_by_price(self):
+        ids = self.walk_cursor_pages({'ordering': 'price'})
+
+        expected = list(Product.objects.order_by('price', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_pagination_by_created_at_desc(self):
+        ids = self.walk_cursor_pages({})
+
+        expected = list(Product.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_rejects_search_rank_ordering(self):
+        response = self.client.get(self.list_url, {'pagination': 'cursor', 'q': 'product'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.data)
+
+    def test_cursor_pagination_with_search_and_ordering(self):
+        ids = self.walk_cursor_pages({'q': 'product', 'ordering': 'price'})
+
+        expected = list(Product.objects.order_by('price', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE product')
+
+        response = self.client.get(self.list_url, {'estimate_count': 'true'})
+        filtered = self.client.get(self.list_url, {'estimate_count': 'true', 'q': 'product'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['count_is_estimated'])
+        self.assertEqual(response.data['count'], 25)
+        self.assertNotIn('count_is_estimated', filtered.data)
+        self.assertEqual(filtered.data['count'], 25)
+
+
+class TestCategoryTree(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.tree_url = reverse('category_tree')
+        cls.create_sub_category_url = reverse('create_sub_category')
+        cls.update_sub_category_status_url = reverse('update_sub_category_status')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.product = create_product_test_data(cls.sub_category)
+        SubCategory.objects.create(category=cls.category, name='Inactive', is_active=False)
+
+    def setUp(self) -> None:
+        invalidate_category_tree()
+        self.client.force_authenticate(user=self.user)
+
+    def test_category_tree(self):
+        response = self.client.get(self.tree_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{
+            'id': self.category.id, 'name': self.category.name, 'product_count': 1,
+            'sub_categories': [
+                {'id': self.sub_category.id, 'name': self.sub_category.name, 'product_count': 1}
+            ]
+        }])
+
+    def test_category_tree_is_cached(self):
+        self.client.get(self.tree_url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.tree_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_category_tree_invalidated_by_writes(self):
+        self.client.get(self.tree_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.create_sub_category_url, {'name': 'New', 'category': self.category.id})
+        created = self.client.get(self.tree_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.update_sub_category_status_url, {'name': self.sub_category.name, 'is_active': False})
+        disabled = self.client.get(self.tree_url)
+
+        self.assertEqual(
+            [sub['name'] for sub in created.data[0]['sub_categories']],
+            ['New', self.sub_category.name]
+        )
+        self.assertEqual([sub['name'] for sub in disabled.data[0]['sub_categories']], ['New'])
+        self.assertEqual(disabled.data[0]['product_count'], 0)
+
+
+class TestLiveProducts(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.list_url = reverse('list_of_products')
+        cls.get_product_url = reverse('product_detail')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.product = create_product_test_data(cls.sub_category)
+        cls.inactive = Product.objects.create(
+            name='Old', brand='Apple', description='test', category=cls.sub_category,
+            is_active=False, deleted_at=timezone.now()
+        )
+        cls.deleted = Product.objects.create(
+            name='Deleted', brand='Apple', description='test', category=cls.sub_category, deleted_at=timezone.now()
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_managers(self):
+        self.assertEqual(list(Product.live.values_list('id', flat=True)), [self.product.id])
+        self.assertEqual(Product.objects.count(), 3)
+
+    def test_list_shows_live_products_only(self):
+        response = self.client.get(self.list_url)
+
+        self.assertEqual([product['id'] for product in response.data['results']], [self.product.id])
+
+    def test_detail_of_inactive_product_not_found(self):
+        response = self.client.get(self.get_product_url, {'id': self.inactive.id})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_estimated_count_of_live_products(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE product')
+
+        response = self.client.get(self.list_url, {'estimate_count': 'true'})
+
+        self.assertTrue(response.data['count_is_estimated'])
+        self.assertEqual(response.data['count'], 1)
+
+
+class TestProductDetailCache(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.get_product_url = reverse('product_detail')
+        cls.update_product_url = reverse('update_product')
+        cls.update_sub_category_status_url = reverse('update_sub_category_status')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.product = create_product_test_data(cls.sub_category)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def get_product(self):
+        return self.client.get(self.get_product_url, {'id': self.product.id})
+
+    def test_product_detail_is_cached(self):
+        first = self.get_product()
+
+        with self.assertNumQueries(0):
+            second = self.get_product()
+        self.assertEqual(first.data, second.data)
+
+    def test_product_update_invalidates_cache(self):
+        self.get_product()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                self.update_product_url,
+                data={'id': self.product.id, 'name': 'Iphone 11', 'brand': 'Apple', 'description': 'test'}
+            )
+
+        self.assertEqual(self.get_product().data['name'], 'Iphone 11')
+
+    def test_sub_category_cascade_invalidates_cache(self):
+        self.get_product()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                self.update_sub_category_status_url,
+                data={'name': self.sub_category.name, 'is_active': False}
+            )
+
+        self.assertEqual(self.get_product().status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_concurrent_misses_build_once(self):
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def build():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'id': 0}
+
+        def read():
+            barrier.wait()
+            results.append(get_cached_product(0, build))
+
+        results = []
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'id': 0}] * 8)
+
+    def test_local_cache_keeps_payloads_briefly(self):
+        self.assertEqual(get_product_cache_timeout(), LOCAL_PRODUCT_CACHE_TIMEOUT)
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(get_product_cache_timeout(), PRODUCT_CACHE_TIMEOUT)
+
+
+class TestProductImport(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.import_url = reverse('import_products')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+    def test_import_csv(self):
+        upload = SimpleUploadedFile('feed.csv', (
+            'sub_category,name,brand,description,price,quantity\n'
+            'Test SubCategory,Pixel 8,Google,Phone,799.99,5\n'
+            'Test SubCategory,Pixel 7,Google,Phone,not-a-price,5\n'
+            'Unknown,Pixel 6,Google,Phone,499,\n'
+            'Test SubCategory,Pixel 6a,Google,Phone,,\n'
+        ).encode())
+
+        response = self.client.post(self.import_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 4)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        pixel = Product.objects.get(name='Pixel 8')
+        self.assertEqual(pixel.category, self.sub_category)
+        self.assertEqual(str(pixel.price), '799.99')
+        self.assertEqual(Product.objects.get(name='Pixel 6a').quantity, 1)
+        self.assertEqual(
+            list(Product.objects.filter(search_vector='pixel').order_by('name').values_list('name', flat=True)),
+            ['Pixel 6a', 'Pixel 8']
+        )
+
+    def test_import_unsupported_format(self):
+        upload = SimpleUploadedFile('feed.xml', b'<products/>')
+
+        response = self.client.post(self.import_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_products_command_jsonl(self):
+        rows = [
+            {'sub_category': 'Test SubCategory', 'name': f'Item {i}', 'brand': 'Brand', 'description': 'test'}
+            for i in range(5)
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as feed:
+            feed.write('\n'.join(json.dumps(row) for row in rows) + '\n{broken\n')
+        self.addCleanup(os.remove, feed.name)
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_products', feed.name, batch_size=2, no_copy=True, stdout=stdout, stderr=stderr)
+
+        self.assertEqual(Product.objects.filter(name__startswith='Item').count(), 5)
+        self.assertIn('Row 6', stderr.getvalue())
+
+
+class TestBatchUpdateProducts(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.batch_update_url = reverse('batch_update_products')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.products = [create_product_test_data(cls.sub_category) for _ in range(3)]
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+    def test_batch_update(self):
+        first, second, third = self.products
+        patches = [
+            {'id': first.id, 'price': '10.50'},
+            {'id': second.id, 'quantity': 7, 'name': 'Renamed'},
+            {'id': third.id, 'price': 'free'},
+            {'id': 999999, 'quantity': 1},
+            {'id': first.id, 'quantity': 1},
+        ]
+
+        with self.assertNumQueries(4):  # savepoint, locked read, bulk update, release
+            response = self.client.patch(self.batch_update_url, data=patches, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['updated', 'updated', 'error', 'error', 'error']
+        )
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(str(first.price), '10.50')
+        self.assertEqual(first.quantity, 100)
+        self.assertEqual((second.name, second.quantity, second.price), ('Renamed', 7, 1000))
+        self.assertEqual(Product.objects.get(id=third.id).price, 1000)
+
+    def test_batch_update_locks_rows_in_id_order(self):
+        first, second, third = self.products
+        patches = [{'id': product.id, 'quantity': 1} for product in (third, first, second)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.batch_update_url, data=patches, format='json')
+
+        self.assertEqual(response.data['updated'], 3)
+        lock_query, = [query['sql'] for query in queries.captured_queries if 'FOR UPDATE' in query['sql']]
+        self.assertIn('ORDER BY "product"."id" ASC', lock_query)
+
+    def test_batch_update_requires_list(self):
+        response = self.client.patch(self.batch_update_url, data={'id': 1}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_update_size_is_limited(self):
+        patches = [{'id': self.products[0].id, 'quantity': 1}] * (BATCH_UPDATE_MAX_PRODUCTS + 1)
+
+        with self.assertNumQueries(0):
+            response = self.client.patch(self.batch_update_url, data=patches, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestProductExport(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.export_url = reverse('export_products')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.other_sub_category = SubCategory.objects.create(category=cls.category, name='Other')
+        cls.product = create_product_test_data(cls.sub_category)
+        cls.inactive = Product.objects.create(
+            name='Old', brand='Brand', description='test', category=cls.other_sub_category, is_active=False
+        )
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+    def export(self, params):
+        response = self.client.get(self.export_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_jsonl(self):
+        rows = [json.loads(line) for line in self.export({'is_active': 'true'}).splitlines()]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], self.product.id)
+        self.assertEqual(rows[0]['sub_category_name'], self.sub_category.name)
+        self.assertEqual(rows[0]['parent_category_name'], self.category.name)
+
+    def test_export_csv(self):
+        content = self.export({'export_format': 'csv', 'sub_category': self.other_sub_category.id})
+
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row['name'] for row in rows], ['Old'])
+        self.assertEqual(rows[0]['is_active'], 'False')
+
+    def test_export_products_command(self):
+        stdout = StringIO()
+        call_command('export_products', category=self.category.id, stdout=stdout)
+
+        ids = [json.loads(line)['id'] for line in stdout.getvalue().splitlines()]
+        self.assertEqual(ids, [self.product.id, self.inactive.id])
+
+
+class TestDeactivationCascade(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.update_category_status_url = reverse('update_category_status')
+        cls.update_sub_category_status_url = reverse('update_sub_category_status')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.other_sub_category = SubCategory.objects.create(category=cls.category, name='Other')
+        cls.products = [create_product_test_data(cls.sub_category) for _ in range(3)]
+        cls.other_product = create_product_test_data(cls.other_sub_category)
+
+    def setUp(self) -> None:
+        self.client.force_authenticate(user=self.user)
+
+    def test_deactivate_category_cascades_to_products(self):
+        response = self.client.put(
+            self.update_category_status_url, {'name': self.category.name, 'is_active': False}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(SubCategory.objects.filter(category=self.category, is_active=True).exists())
+        self.assertFalse(Product.objects.filter(is_active=True).exists())
+        self.assertFalse(Product.objects.filter(deleted_at__isnull=True).exists())
+
+    def test_deactivate_sub_category_cascades_to_its_products(self):
+        response = self.client.put(
+            self.update_sub_category_status_url, {'name': self.sub_category.name, 'is_active': False}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Product.objects.filter(category=self.sub_category, is_active=True).exists())
+        self.assertTrue(Product.objects.get(id=self.other_product.id).is_active)
+
+    def test_deactivate_category_command_in_chunks(self):
+        stdout = StringIO()
+        call_command('deactivate_category', self.category.name, chunk_size=2, stdout=stdout)
+
+        self.assertIn('Deactivated 2 of 4 products', stdout.getvalue())
+        self.assertIn('Deactivated 4 of 4 products', stdout.getvalue())
+        self.assertFalse(Category.objects.get(id=self.category.id).is_active)
+        self.assertFalse(Product.objects.filter(is_active=True).exists())
+
+
+class TestConditionalGet(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.get_product_url = reverse('product_detail')
+        cls.list_url = reverse('list_of_products')
+        cls.category_list_url = reverse('get_category')
+        cls.create_category_url = reverse('create_category')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.product = create_product_test_data(cls.sub_category)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_product_detail_not_modified(self):
+        response = self.client.get(self.get_product_url, {'id': self.product.id})
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(self.get_product_url, {'id': self.product.id}, HTTP_IF_NONE_MATCH=etag)
+        since = self.client.get(
+            self.get_product_url, {'id': self.product.id}, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_product_detail_modified(self):
+        etag = self.client.get(self.get_product_url, {'id': self.product.id})['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(id=self.product.id).update(price=1, updated_at=timezone.now())
+            invalidate_products([self.product.id])
+        response = self.client.get(self.get_product_url, {'id': self.product.id}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_product_list_not_modified(self):
+        etag = self.client.get(self.list_url)['ETag']
+
+        not_modified = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        other_page = self.client.get(self.list_url, {'ordering': 'price'}, HTTP_IF_NONE_MATCH=etag)
+        create_product_test_data(self.sub_category)
+        modified = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(other_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(modified.data['count'], 2)
+
+    def test_cursor_and_estimated_lists_skip_etag_aggregate(self):
+        for params in ({'pagination': 'cursor'}, {'estimate_count': 'true'}):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.list_url, params)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('ETag', response)
+            self.assertFalse([query for query in queries.captured_queries if 'MAX(' in query['sql']], params)
+
+    def test_category_list_not_modified(self):
+        etag = self.client.get(self.category_list_url)['ETag']
+
+        not_modified = self.client.get(self.category_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.create_category_url, {'name': 'New'})
+        modified = self.client.get(self.category_list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+
+
+class TestProductFacets(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.facets_url = reverse('product_facets')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.other_sub_category = SubCategory.objects.create(category=cls.category, name='Other')
+        for name, brand, price, sub_category in (
+            ('Iphone 15', 'Apple', 1200, cls.sub_category),
+            ('Iphone 13', 'Apple', 700, cls.sub_category),
+            ('Galaxy S23', 'Samsung', 900, cls.sub_category),
+            ('Galaxy buds', 'Samsung', 80, cls.other_sub_category),
+        ):
+            Product.objects.create(name=name, brand=brand, price=price, description='test', category=sub_category)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_facets(self):
+        with self.assertNumQueries(3):  # one query per facet
+            response = self.client.get(self.facets_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['brand'], [{'brand': 'Apple', 'count': 2}, {'brand': 'Samsung', 'count': 2}])
+        self.assertEqual(
+            [(facet['sub_category_id'], facet['count']) for facet in response.data['sub_category']],
+            [(self.sub_category.id, 3), (self.other_sub_category.id, 1)]
+        )
+        self.assertEqual(response.data['price'], [
+            {'range': '0-100', 'count': 1}, {'range': '500-1000', 'count': 2}, {'range': '1000-5000', 'count': 1}
+        ])
+
+    def test_facets_follow_search_and_are_cached(self):
+        response = self.client.get(self.facets_url, {'q': 'galaxy', 'page': 1})
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.facets_url, {'page': 2, 'q': 'galaxy'})
+
+        self.assertEqual(response.data['brand'], [{'brand': 'Samsung', 'count': 2}])
+        self.assertEqual(cached.data, response.data)
+
+    def test_facets_conditional_get(self):
+        etag = self.client.get(self.facets_url)['ETag']
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(self.facets_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class TestProductFilter(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.list_url = reverse('list_of_products')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.other_category = Category.objects.create(name='Other')
+        cls.other_sub_category = SubCategory.objects.create(category=cls.other_category, name='Other')
+        cls.cheap = Product.objects.create(
+            name='Cheap', brand='Xiaomi', price=100, quantity=0, description='test', category=cls.sub_category
+        )
+        cls.middle = Product.objects.create(
+            name='Middle', brand='Samsung', price=500, description='test', category=cls.sub_category
+        )
+        cls.expensive = Product.objects.create(
+            name='Expensive', brand='Apple', price=1500, description='test', category=cls.other_sub_category
+        )
+
+    def filter_ids(self, params):
+        response = self.client.get(self.list_url, {**params, 'ordering': 'price'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product['id'] for product in response.data['results']]
+
+    def test_price_range(self):
+        self.assertEqual(self.filter_ids({'min_price': 200, 'max_price': 1500}), [self.middle.id, self.expensive.id])
+
+    def test_brand_list(self):
+        self.assertEqual(self.filter_ids({'brand': 'Apple,Xiaomi'}), [self.cheap.id, self.expensive.id])
+
+    def test_category_and_sub_category(self):
+        self.assertEqual(self.filter_ids({'category': self.other_category.id}), [self.expensive.id])
+        self.assertEqual(self.filter_ids({'sub_category': self.sub_category.id}), [self.cheap.id, self.middle.id])
+
+    def test_in_stock(self):
+        self.assertEqual(self.filter_ids({'in_stock': 'true'}), [self.middle.id, self.expensive.id])
+
+    def test_is_active_is_not_a_public_filter(self):
+        self.assertEqual(
+            self.filter_ids({'is_active': 'false'}), [self.cheap.id, self.middle.id, self.expensive.id]
+        )
+
+
+class TestValuesSerializer(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.list_url = reverse('list_of_products')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        for price in ('0', '12.5', '99999999.99', '1000'):
+            Product.objects.create(
+                name=f'Product {price}', brand='Brand', description='Ünicode "quoted"',
+                price=price, quantity=0, category=cls.sub_category
+            )
+
+    def test_output_is_byte_identical(self):
+        queryset = Product.objects.order_by('-created_at', '-id')
+        values_serializer = ValuesSerializer(GetProductSerializer)
+
+        expected = JSONRenderer().render(GetProductSerializer(queryset, many=True).data)
+        actual = JSONRenderer().render(values_serializer.to_representation(values_serializer.get_queryset(queryset)))
+
+        self.assertEqual(actual, expected)
+
+    def test_list_matches_serializer(self):
+        response = self.client.get(self.list_url)
+
+        expected = GetProductSerializer(Product.objects.order_by('-created_at'), many=True).data
+        self.assertEqual(json.dumps(response.data['results']), json.dumps(expected))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_product_serialization', rows=50, repeat=1, stdout=out)
+
+        self.assertIn('rows: 50, output identical', out.getvalue())
+        self.assertEqual(Product.objects.count(), 4)
+
+
+class TestProductSuggest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.suggest_url = reverse('product_suggest')
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        for name, brand in (('Iphone 10', 'Apple'), ('Iphone 10 Pro Max', 'Apple'), ('Galaxy S10', 'Samsung')):
+            Product.objects.create(name=name, brand=brand, description='test', category=cls.sub_category)
+        Product.objects.create(
+            name='Iphone 4', brand='Apple', description='test', category=cls.sub_category, is_active=False
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        suggest_services.invalidate_prefix_index()
+
+    def suggest(self, q, **params):
+        response = self.client.get(self.suggest_url, {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(suggestion['text'], suggestion['field']) for suggestion in response.data['results']]
+
+    @mock.patch.object(suggest_services, 'trigram_available', return_value=False)
+    def test_prefix_index_fallback(self, _):
+        self.assertEqual(self.suggest('iph'), [('Iphone 10', 'name'), ('Iphone 10 Pro Max', 'name')])
+        self.assertEqual(self.suggest('APP'), [('Apple', 'brand')])
+        # Any word of a name can be completed
+        self.assertEqual(self.suggest('pro m'), [('Iphone 10 Pro Max', 'name')])
+
+    @mock.patch.object(suggest_services, 'trigram_available', return_value=False)
+    def test_limit_and_short_terms(self, _):
+        self.assertEqual(self.suggest('iph', limit=1), [('Iphone 10', 'name')])
+        self.assertEqual(self.suggest('i'), [])
+        self.assertEqual(self.client.get(self.suggest_url, {'q': 'iph', 'limit': 'x'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    @mock.patch.object(suggest_services, 'trigram_available', return_value=False)
+    def test_popular_prefixes_are_cached(self, _):
+        self.suggest('gal')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('Gal'), [('Galaxy S10', 'name')])
+
+    def test_trigram_suggestions(self):
+        if not suggest_services.trigram_available():
+            self.skipTest('pg_trgm is not installed')
+
+        suggestions = self.suggest('iphon')
+
+        self.assertEqual(suggestions[0][1], 'name')
+        self.assertNotIn(('Iphone 4', 'name'), suggestions)
+
+
+class TestProductQueryBudgets(QueryBudgetMixin, APITestCase):
+    """Every product and category endpoint stays within its declared number of queries."""
+    query_budgets = {
+        'create_product': 2,
+        'export_products': 1,
+        'import_products': 4,
+        'update_product': 2,
+        'batch_update_products': 4,
+        'is_active_status_product': 2,
+        'product_suggest': 3,
+        'product_detail': 2,
+        'list_of_products': 3,
+        'product_facets': 3,
+        'create_category': 2,
+        'update_category_status': 7,
+        'get_category': 3,
+        'category_tree': 2,
+        'create_sub_category': 3,
+        'update_sub_category_status': 8,
+        'activate_subcategories': 3,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_staff_user_test_data()
+        cls.category = create_category_test_data()
+        cls.sub_category = create_subcategory_test_data(cls.category)
+        cls.products = Product.objects.bulk_create([
+            Product(name=f'Product {i}', brand='Brand', description='test', category=cls.sub_category)
+            for i in range(20)
+        ])
+
+    def setUp(self) -> None:
+        cache.clear()
+        invalidate_category_tree()
+        suggest_services.invalidate_prefix_index()
+        self.client.force_authenticate(user=self.user)
+
+    def request(self, name, method='get', data=None, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertQueryBudget(self.query_budgets[name], name):
+                response = getattr(self.client, method)(reverse(name), data=data, **kwargs)
+                if hasattr(response, 'streaming_content'):
+                    b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, response.content if hasattr(response, 'content') else name)
+        return response
+
+    def test_every_endpoint_has_budget(self):
+        self.assertBudgetsCoverUrls(self.query_budgets, 'product.urls')
+
+    def test_product_reads(self):
+        product_id = self.products[0].id
+        self.request('list_of_products')
+        self.request('list_of_products', data={
+            'pagination': 'cursor', 'brand': 'Brand', 'q': 'product', 'ordering': 'price'
+        })
+        self.request('product_facets')
+        self.request('product_detail', data={'id': product_id})
+        self.request('product_suggest', data={'q': 'prod'})
+        self.request('export_products')
+
+    def test_product_writes(self):
+        product_id = self.products[0].id
+        self.request('create_product', 'post', {
+            'category': self.sub_category.id, 'name': 'New', 'brand': 'Brand', 'description': 'test'
+        })
+        self.request('update_product', 'put', {
+            'id': product_id, 'name': 'Renamed', 'brand': 'Brand', 'description': 'test'
+        })
+        self.request('batch_update_products', 'patch', [
+            {'id': product.id, 'price': '10.00'} for product in self.products
+        ], format='json')
+        self.request('is_active_status_product', 'put', {'id': product_id, 'is_active': False})
+        self.request('import_products', 'post', {'file': SimpleUploadedFile('feed.csv', (
+            'sub_category,name,brand,description,price,quantity\n'
+            + ''.join(f'{self.sub_category.name},Imported {i},Brand,test,1.00,1\n' for i in range(20))
+        ).encode())}, format='multipart')
+
+    def test_category_reads(self):
+        self.request('get_category')
+        self.request('category_tree')
+
+    def test_category_writes(self):
+        self.request('create_category', 'post', {'name': 'New'})
+        self.request('create_sub_category', 'post', {'category': self.category.id, 'name': 'New sub'})
+        self.request('update_sub_category_status', 'put', {'name': self.sub_category.name, 'is_active': False})
+        self.request('activate_subcategories', 'put', {'name': self.category.name, 'is_active': True})
+        self.request('update_category_status', 'put', {'name': self.category.name, 'is_active': False})
@@ -4,14 +4,20 @@ from product import views
 urlpatterns = [
     # Product
     path('product/create/', views.CreateProductView.as_view(), name='create_product'),
+    path('product/export/', views.ExportProductsView.as_view(), name='export_products'),
+    path('product/import/', views.ImportProductsView.as_view(), name='import_products'),
     path('product/update/', views.UpdateProductView.as_view(), name='update_product'),
+    path('product/update/batch/', views.BatchUpdateProductsView.as_view(), name='batch_update_products'),
     path('product/is_active/', views.IsActivaStatusProductView.as_view(), name='is_active_status_product'),
+    path('product/suggest/', views.ProductSuggestView.as_view(), name='product_suggest'),
     path('product/detail/', views.GetProduct.as_view(), name='product_detail'),
     path('product/', views.ProductsListAPIView.as_view(), name='list_of_products'),
+    path('product/facets/', views.ProductFacetsAPIView.as_view(), name='product_facets'),
     # Category
     path('category/create/', views.CreateCategory.as_view(), name='create_category'),
     path('category/update-status/', views.UpdateStatusCategoryView.as_view(), name='update_category_status'),
     path('category/all/', views.GetCategoryListView.as_view(), name='get_category'),
+    path('category/tree/', views.CategoryTreeView.as_view(), name='category_tree'),
     path('sub_category/create/', views.CreateSubCategory.as_view(), name='create_sub_category'),
     path('sub_category/update-status/',
          views.UpdateStatusSubCategoryView.as_view(), name='update_sub_category_status'),
@@ -0,0 +1,109 @@
+import decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.settings import api_settings
+
+
+def _identity(value):
+    return value
+
+
+def _decimal_converter(field):
+    """Same output as `DecimalField.to_representation` with the default settings."""
+    if (
+        field.decimal_places is None or field.localize or field.rounding is not None
+        or not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    ):
+        return None
+
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+
+    def convert(value):
+        return '{:f}'.format(value.quantize(exponent, context=context))
+    return convert
+
+
+def _datetime_converter(field, tz):
+    """Same output as `DateTimeField.to_representation` for ISO 8601 and aware values."""
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() != fields.ISO_8601:
+        return None
+    tz = getattr(field, 'timezone', tz)
+    if tz is None:
+        return None
+
+    def convert(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+# Field types whose representation of a database value is the value itself
+IDENTITY_FIELDS = (fields.CharField, fields.IntegerField, fields.BooleanField, relations.PrimaryKeyRelatedField)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path of a flat ModelSerializer.
+    Rows are fetched with `.values()` and converted by precompiled per-field
+    converters, the result is the same as `serializer_class(many=True).data`.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._fields = None
+        self._converters = {}
+
+    @property
+    def fields(self) -> list:
+        """(name, values() key, DRF field) of every serializer field."""
+        if self._fields is None:
+            serializer_fields = []
+            for name, field in self.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if field.source == '*' or '.' in field.source or isinstance(field, fields.SerializerMethodField):
+                    raise ImproperlyConfigured(f'{self.serializer_class.__name__}.{name} is not a model column.')
+                serializer_fields.append((name, field.source, field))
+            self._fields = serializer_fields
+        return self._fields
+
+    @property
+    def values_fields(self) -> list:
+        return [source for _, source, _ in self.fields]
+
+    def get_converters(self, tz) -> list:
+        if tz not in self._converters:
+            converters = []
+            for name, source, field in self.fields:
+                if isinstance(field, fields.DecimalField):
+                    convert = _decimal_converter(field)
+                elif isinstance(field, fields.DateTimeField):
+                    convert = _datetime_converter(field, tz)
+                elif isinstance(field, IDENTITY_FIELDS) and getattr(field, 'pk_field', None) is None:
+                    convert = _identity
+                else:
+                    convert = None
+                converters.append((name, source, convert or field.to_representation))
+            self._converters[tz] = converters
+        return self._converters[tz]
+
+    def get_queryset(self, queryset):
+        return queryset.values(*self.values_fields)
+
+    def to_representation(self, rows) -> list:
+        converters = self.get_converters(timezone.get_current_timezone() if settings.USE_TZ else None)
+        return [
+            {
+                name: None if row[source] is None else convert(row[source])
+                for name, source, convert in converters
+            }
+            for row in rows
+        ]
@@ -4,18 +4,35 @@ from rest_framework.generics import (
     CreateAPIView, RetrieveAPIView,
     ListAPIView, UpdateAPIView
 )
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.exceptions import ValidationError
-from rest_framework.pagination import PageNumberPagination
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from django_filters.rest_framework import DjangoFilterBackend
 
 from product.models import Category, SubCategory, Product
+from product.conditional import ConditionalGetMixin, get_content_etag, get_queryset_etag
+from product.filters import FullTextSearchFilter, ProductFilter
+from product.pagination import EstimatedCountPageNumberPagination, KeysetPagination
+from product.values_serializers import ValuesSerializer
+from customer.authentication import CachedJWTAuthentication
 from customer.permissions import IsStaffOrSuperuserPermission
 from product import serializers
-from product.services.category_services import ActivateOrDeactivateCategoryAPIView
-from product.services.product_services import get_product_by_id
+from product.services.cascade_services import deactivate_category
+from product.services.category_services import ActivateOrDeactivateCategoryAPIView, get_category_tree
+from product.services.export_services import (
+    EXPORT_CONTENT_TYPES, EXPORT_FORMATS, get_export_queryset, iter_export_rows, render_export
+)
+from product.services.facet_services import get_facets
+from product.services.import_services import IMPORT_FORMATS, import_products, iter_rows
+from product.services.product_cache import get_cached_product, peek_cached_product
+from product.services.product_services import (
+    BATCH_UPDATE_MAX_PRODUCTS, batch_update_products, get_product_by_id, parse_product_id
+)
+from product.services.suggest_services import SUGGEST_LIMIT, SUGGEST_MAX_LIMIT, get_suggestions
 
 
 class CreateProductView(CreateAPIView):
@@ -28,6 +45,67 @@ class CreateProductView(CreateAPIView):
     serializer_class = serializers.CreateProductSerializer
 
 
+class ImportProductsView(APIView):
+    """
+    Import products from an uploaded CSV or JSONL `file`.
+    Rows are streamed and inserted in batches, the response reports per-row errors.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsStaffOrSuperuserPermission,)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request):
+        upload = request.data.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'File must be given'})
+
+        file_format = request.data.get('file_format') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in IMPORT_FORMATS:
+            raise ValidationError({'file_format': f'Supported formats: {", ".join(IMPORT_FORMATS)}'})
+
+        report = import_products(iter_rows(upload, file_format))
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+class ExportProductsView(APIView):
+    """
+    Stream the catalog as JSONL or CSV (`?export_format=`).
+    Can be filtered by `?category=`, `?sub_category=` ids and `?is_active=`.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsStaffOrSuperuserPermission,)
+
+    def get_int_param(self, name):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({'error': {name: 'You should give a number!'}})
+
+    def get(self, request):
+        export_format = request.query_params.get('export_format', 'jsonl')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'export_format': f'Supported formats: {", ".join(EXPORT_FORMATS)}'})
+
+        is_active = request.query_params.get('is_active')
+        if is_active is not None:
+            is_active = is_active.lower() in ('1', 'true')
+
+        queryset = get_export_queryset(
+            category_id=self.get_int_param('category'),
+            sub_category_id=self.get_int_param('sub_category'),
+            is_active=is_active,
+        )
+        response = StreamingHttpResponse(
+            render_export(iter_export_rows(queryset), export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{export_format}"'
+        return response
+
+
 class UpdateProductView(UpdateAPIView):
     """
     Update selected fields of a product.
@@ -52,6 +130,29 @@ class UpdateProductView(UpdateAPIView):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
+class BatchUpdateProductsView(APIView):
+    """
+    Update price, quantity and other fields of many products at once.
+    Takes a list of patches with `id`, reports the result of every item.
+    """
+    authentication_classes = (CachedJWTAuthentication,)
+    permission_classes = (IsStaffOrSuperuserPermission,)
+
+    def patch(self, request):
+        patches = request.data
+        if not isinstance(patches, list) or not patches:
+            raise ValidationError({'message': 'Expected a non-empty list of product patches.'})
+        if len(patches) > BATCH_UPDATE_MAX_PRODUCTS:
+            raise ValidationError({'message': f'At most {BATCH_UPDATE_MAX_PRODUCTS} products can be updated at once.'})
+
+        results = batch_update_products(patches)
+        return Response({
+            'updated': sum(result['status'] == 'updated' for result in results),
+            'failed': sum(result['status'] == 'error' for result in results),
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
+
 class IsActivaStatusProductView(UpdateAPIView):
     """
     Update the is_active status of a product.
@@ -67,9 +168,11 @@ class IsActivaStatusProductView(UpdateAPIView):
         return get_product_by_id(product_id)
 
 
-class GetProduct(RetrieveAPIView):
+class GetProduct(ConditionalGetMixin, RetrieveAPIView):
     """
-    Retrieve product details by ID.
+    Retrieve details of a live product by ID.
+    Payloads are served from a read-through cache invalidated by product writes,
+    ETag and Last-Modified come from `Product.updated_at`.
     """
     authentication_classes = ()
     permission_classes = ()
@@ -77,7 +180,48 @@ class GetProduct(RetrieveAPIView):
 
     def get_object(self):
         product_id = self.request.query_params.get('id')
-        return get_product_by_id(product_id)
+        return get_product_by_id(product_id, queryset=Product.live)
+
+    def build_cache_entry(self) -> dict:
+        product = self.get_object()
+        return {'updated_at': product.updated_at, 'data': dict(self.get_serializer(product).data)}
+
+    def get_validators(self, request):
+        product_id = parse_product_id(request.query_params.get('id'))
+        entry = peek_cached_product(product_id)
+        if entry is not None:
+            updated_at = entry['updated_at']
+        else:
+            updated_at = Product.live.filter(id=product_id).values_list('updated_at', flat=True).first()
+
+        if updated_at is None:
+            return None, None
+        return f'W/"{updated_at.timestamp()}"', updated_at
+
+    def retrieve(self, request, *args, **kwargs):
+        product_id = parse_product_id(self.request.query_params.get('id'))
+        entry = get_cached_product(product_id, self.build_cache_entry)
+        return Response(entry['data'])
+
+
+class ProductSuggestView(APIView):
+    """
+    Typeahead suggestions for product names and brands by `?q=`,
+    ranked by similarity, at most `?limit=` results.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', SUGGEST_LIMIT)), SUGGEST_MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({'error': {'limit': 'You should give a number!'}})
+        if limit < 1:
+            raise ValidationError({'error': {'limit': 'Limit must be positive.'}})
+
+        term = request.query_params.get('q', '')
+        return Response({'query': term, 'results': get_suggestions(term, limit)})
 
 
 class CreateCategory(CreateAPIView):
@@ -89,7 +233,7 @@ class CreateCategory(CreateAPIView):
     serializer_class = serializers.CategorySerializer
 
 
-class GetCategoryListView(ListAPIView):
+class GetCategoryListView(ConditionalGetMixin, ListAPIView):
     """
     This class retrieve list of categories.
     """
@@ -97,6 +241,21 @@ class GetCategoryListView(ListAPIView):
     serializer_class = serializers.CategorySerializer
     queryset = Category.objects.all()
 
+    def get_validators(self, request):
+        return get_queryset_etag(self.filter_queryset(self.get_queryset()), request), None
+
+
+class CategoryTreeView(APIView):
+    """
+    Active categories with nested active sub categories and product counts.
+    Served from an in-process cache that category writes invalidate.
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request):
+        return Response(get_category_tree())
+
 
 class CategoryDisableSubcategoriesView(UpdateAPIView):
     """
@@ -108,12 +267,7 @@ class CategoryDisableSubcategoriesView(UpdateAPIView):
     queryset = Category
 
     def disable_category_and_subcategories(self, category) -> None:
-        category.is_active = False
-        category.save()
-
-        subcategories = SubCategory.objects.filter(category=category.pk, is_active=True)
-        for subcategory in subcategories:
-            self.disable_category_and_subcategories(subcategory)
+        deactivate_category(category)
 
     def get_object(self):
         name = self.request.data.get('name')
@@ -175,19 +329,66 @@ class CreateSubCategory(CreateAPIView):
     serializer_class = serializers.CreateSubCategorySerializer
 
 
-class ProductsListAPIView(ListAPIView):
+class ProductsListAPIView(ConditionalGetMixin, ListAPIView):
     """
-    This class defines a view for listing products
+    This class defines a view for listing live products
     with optional filtering and ordering.
+    `?q=` runs a ranked full-text search, `?search=` a plain substring search.
+    `?pagination=cursor` switches to keyset pagination, without COUNT(*) and OFFSET.
+    Conditional GET is answered from one aggregate over the filtered products,
+    cursor and estimated count pages skip it as it would count the filtered set.
+    Rows are serialized from `.values()` by `values_serializer`,
+    with the same output as `serializer_class`.
     """
     authentication_classes = []
     serializer_class = serializers.GetProductSerializer
-    pagination_class = PageNumberPagination
-    filter_backends = [OrderingFilter, DjangoFilterBackend, SearchFilter]
+    values_serializer = ValuesSerializer(serializers.GetProductSerializer)
+    pagination_class = EstimatedCountPageNumberPagination
+    cursor_pagination_class = KeysetPagination
+    filter_backends = [OrderingFilter, DjangoFilterBackend, SearchFilter, FullTextSearchFilter]
     search_fields = ['name', 'description', 'brand']
-    filter_fields = ['name', 'brand', 'category__name']
-    ordering_fields = ['price']
+    filterset_class = ProductFilter
+    ordering_fields = ['price', 'created_at']
+
+    def get_validators(self, request):
+        paginator = self.paginator
+        if isinstance(paginator, KeysetPagination) or paginator.estimates_count(request):
+            return None, None
+        return get_queryset_etag(self.filter_queryset(self.get_queryset()), request), None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
-        queryset = Product.objects.all()
+        queryset = Product.live.all()
         return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.values_serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.values_serializer.to_representation(page))
+        return Response(self.values_serializer.to_representation(queryset))
+
+
+class ProductFacetsAPIView(ProductsListAPIView):
+    """
+    Counts per brand, sub category and price bucket for the same
+    filters and search as the product list.
+    The ETag is taken from the facets themselves, a cached answer runs no query.
+    """
+
+    def get_validators(self, request):
+        self.facets = get_facets(self.filter_queryset(self.get_queryset()), request.query_params)
+        return get_content_etag(self.facets, request), None
+
+    def list(self, request, *args, **kwargs):
+        return Response(self.facets)